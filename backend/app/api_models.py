@@ -103,6 +103,7 @@ class TurnRequest(BaseModel):
     evidence_uris: Optional[list[str]] = Field(default=[], description="Array of Gemini File API URIs for newly uploaded evidence.")
     # user's floor price (hidden from opponent, used for negotiation strategy)
     floor_price: Optional[float] = Field(default=None, description="User's minimum acceptable settlement amount in RM")
+    stream_tokens: bool = Field(default=False, description="Opt in to raw {\"type\": \"token\"} NDJSON lines with streamed LLM output.")
 
 
 class PvpTurnRequest(BaseModel):
@@ -116,6 +117,7 @@ class PvpTurnRequest(BaseModel):
     userId: Optional[str] = Field(default=None, description="Firebase Auth UID of the user.")
     evidence_uris: Optional[list[str]] = Field(default=[], description="Array of Gemini File API URIs.")
     floor_price: Optional[float] = Field(default=None, description="User's floor/ceiling price in RM.")
+    stream_tokens: bool = Field(default=False, description="Opt in to raw {\"type\": \"token\"} NDJSON lines with streamed LLM output.")
 
 
 class JoinCaseRequest(BaseModel):
@@ -12,8 +12,12 @@ import os
 if sys.stdout and hasattr(sys.stdout, 'encoding') and sys.stdout.encoding and sys.stdout.encoding.lower() not in ('utf-8', 'utf8'):
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+import asyncio
+import concurrent.futures
+import functools
 import json
 import queue
+import re
 import time
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, status, HTTPException, UploadFile, File, Form
@@ -28,10 +32,11 @@ from backend.core.orchestrator import run_dumb_loop, get_case_result, run_case a
 import threading
 from backend.prompts.court_filing import COURT_FILING_PROMPT
 from backend.prompts.settlement_agreement import SETTLEMENT_AGREEMENT_PROMPT, DEADLOCK_COURT_FILING_HTML_PROMPT
-from backend.core.orchestrator import call_gemini_with_retry
+from backend.core.orchestrator import call_gemini_with_retry, _parse_llm_json, evidence_summary_update, HISTORY_FIELDS
 #phase 2
 from backend.logic.evidence import validate_evidence 
 from backend.core.auditor import validate_turn
+from backend.core.gemini_client import get_gemini_client
 # from backend.tts import voice   #add later if need
 
 from backend.prompts.plaintiff import build_plaintiff_prompt
@@ -62,9 +67,26 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.pa
 load_dotenv(dotenv_path=os.path.join(ROOT_DIR, ".env"))
 
 db = None
+# Progress steps that carry streamed LLM text rather than a status message;
+# forwarded as NDJSON token lines only when the request sets stream_tokens
+TOKEN_STEPS = {"plaintiff_token", "defendant_token"}
+# Message fields the settlement/filing documents read (field mask on the messages stream)
+OFFER_HISTORY_FIELDS = HISTORY_FIELDS + ["counter_offer_rm"]
 # -----------------------------------------------------------------------------
 # Firebase Admin SDK initialization (placeholder)
 # -----------------------------------------------------------------------------
+def _firebase_options() -> Dict[str, str]:
+    """initialize_app options from env; an explicit projectId skips project discovery."""
+    options = {}
+    storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET", "")
+    if storage_bucket:
+        options["storageBucket"] = storage_bucket
+    project_id = os.getenv("FIREBASE_PROJECT_ID", "")
+    if project_id:
+        options["projectId"] = project_id
+    return options
+
+
 def _init_firebase() -> None:
     """
     Initialize Firebase Admin SDK using credentials from .env or service account JSON.
@@ -82,9 +104,7 @@ def _init_firebase() -> None:
         try:
             sa_dict = json.loads(sa_json)
             cred = credentials.Certificate(sa_dict)
-            storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET", "")
-            options = {"storageBucket": storage_bucket} if storage_bucket else {}
-            firebase_admin.initialize_app(cred, options)
+            firebase_admin.initialize_app(cred, _firebase_options())
             print("Firebase initialized from FIREBASE_SERVICE_ACCOUNT_JSON env var")
             return
         except Exception as e:
@@ -100,14 +120,60 @@ def _init_firebase() -> None:
 
     if service_account_path and os.path.isfile(service_account_path):
         cred = credentials.Certificate(service_account_path)
-        storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET", "")
-        options = {"storageBucket": storage_bucket} if storage_bucket else {}
-        firebase_admin.initialize_app(cred, options)
+        firebase_admin.initialize_app(cred, _firebase_options())
         print(f"Firebase initialized with service account: {service_account_path}")
     else:
         print(f"Firebase credentials not found at {service_account_path}. Running in mock mode.")
 
 
+# Bounded pool for sync SDK calls (Gemini, Pinecone, auditor) made from async endpoints,
+# so they never run on — or block — the event loop
+_BLOCKING_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="blocking-sdk")
+# Concurrent Gemini calls from endpoints, sized to the Gemini RPM quota
+_GEMINI_SEM = asyncio.Semaphore(4)
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BLOCKING_POOL, functools.partial(fn, *args, **kwargs))
+
+
+async def _run_gemini(fn, *args, **kwargs):
+    async with _GEMINI_SEM:
+        return await _run_blocking(fn, *args, **kwargs)
+
+
+# Document templates use {name} placeholders next to literal CSS/JSON braces, so they
+# are filled in one pass over a pre-split template instead of chained str.replace()
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+
+@functools.lru_cache(maxsize=16)
+def _template_parts(template: str) -> tuple:
+    return tuple(_PLACEHOLDER_RE.split(template))
+
+
+def _fill_template(template: str, **values: str) -> str:
+    """Substitute known {name} placeholders; unknown ones are left as-is."""
+    parts = list(_template_parts(template))
+    for i in range(1, len(parts), 2):
+        name = parts[i]
+        parts[i] = str(values[name]) if name in values else "{" + name + "}"
+    return "".join(parts)
+
+
+# Markdown fence around generated HTML documents; the closing fence may be
+# missing when the model output is truncated
+_HTML_FENCE_RE = re.compile(r"^```(?:html)?\s*(.*?)\s*(?:```\s*)?$", re.DOTALL | re.IGNORECASE)
+
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if not text.startswith("```"):
+        return text
+    return _HTML_FENCE_RE.match(text).group(1)
+
+
 def _ensure_db_initialized() -> None:
     """Best-effort lazy initialization for Firebase/Firestore."""
     global db
@@ -174,10 +240,21 @@ app.add_middleware(
 )
 
 
+def _warm_firestore() -> None:
+    """One tiny read so the gRPC channel and auth token exist before the first real request."""
+    try:
+        db.collection("_warmup").document("ping").get()
+    except Exception as exc:
+        print(f"Firestore warm-up skipped: {exc}")
+
+
 @app.on_event("startup")
 async def startup_event() -> None:
     """Initialize Firebase on startup."""
     _ensure_db_initialized()
+    if db is not None:
+        # Fire and forget: startup is not held up by the round trip
+        _BLOCKING_POOL.submit(_warm_firestore)
 
 # -----------------------------------------------------------------------------
 # Error handling
@@ -228,6 +305,9 @@ async def start_case(request: StartCaseRequest) -> StartCaseResponse:
             "createdAt": firestore.SERVER_TIMESTAMP,
             "createdBy": request.createdBy or "mock-user-id",
             "mode": request.mode,  # "ai" or "pvp"
+            "plaintiffMessageCount": 0,
+            "mediatorInjected": False,
+            "evidenceSummary": [],
         }
         # For PvP mode, add participant tracking and turn management
         if request.mode == "pvp":
@@ -265,7 +345,8 @@ async def add_evidence(
     # TODO: orchestrator.add_evidence(case_id=case_id, ...)
     if db:
         case_ref = db.collection("cases").document(caseId)
-        if not case_ref.get().exists:
+        case_doc = await _run_blocking(case_ref.get)
+        if not case_doc.exists:
             raise HTTPException(
                 status_code=404,
                 detail=f"Case with ID {caseId} not found.",
@@ -279,7 +360,14 @@ async def add_evidence(
         }
         if request.text:
             evidence_data["extractedText"] = request.text
-        db.collection("cases").document(caseId).collection("evidence").document(evidence_id).set(evidence_data)
+        # Evidence doc + case-level summary/version land in one commit
+        def _save_evidence():
+            batch = db.batch()
+            batch.set(case_ref.collection("evidence").document(evidence_id), evidence_data)
+            batch.update(case_ref, evidence_summary_update(case_ref, case_doc.to_dict(), evidence_id, request.text))
+            batch.commit()
+
+        await _run_blocking(_save_evidence)
     # orchestrator.add_evidence(case_id=caseId, file_type=request.fileType, storage_url=request.storageUrl, text=request.text)
     return CaseEvidenceResponse(evidenceId=evidence_id)
 
@@ -374,6 +462,11 @@ async def next_turn(caseId: str, request: TurnRequest):
     error_holder = [None]
     
     def progress_callback(step, message):
+        if step in TOKEN_STEPS:
+            # Raw JSON chunks — only clients that asked for them get token lines
+            if request.stream_tokens:
+                progress_queue.put(json.dumps({"type": "token", "step": step, "text": message}) + "\n")
+            return
         progress_queue.put(json.dumps({"type": "progress", "step": step, "message": message}) + "\n")
     
     def run_in_thread():
@@ -709,6 +802,11 @@ async def pvp_turn(caseId: str, request: PvpTurnRequest):
     error_holder = [None]
 
     def progress_callback(step, message):
+        if step in TOKEN_STEPS:
+            # Raw JSON chunks — only clients that asked for them get token lines
+            if request.stream_tokens:
+                progress_queue.put(json.dumps({"type": "token", "step": step, "text": message}) + "\n")
+            return
         progress_queue.put(json.dumps({"type": "progress", "step": step, "message": message}) + "\n")
 
     def run_in_thread():
@@ -822,15 +920,16 @@ async def validate_evidence_endpoint(
     # Validate case exists
     if db:
         case_ref = db.collection("cases").document(caseId)
-        if not case_ref.get().exists:
+        if not (await _run_blocking(case_ref.get)).exists:
             raise HTTPException(
                 status_code=404,
                 detail=f"Case with ID {caseId} not found.",
             )
     
-    # Call M2's evidence validator
+    # Call M2's evidence validator (file download + Gemini validation)
     try:
-        result = validate_evidence(
+        result = await _run_gemini(
+            validate_evidence,
             file_url=request.image_url,
             user_claim=request.user_claim
         )
@@ -882,12 +981,12 @@ async def upload_evidence_file(
         _normalize_mime_type,
         MAX_BYTES,
     )
-    from google import genai
 
     # Validate case
     if db:
         case_ref = db.collection("cases").document(caseId)
-        if not case_ref.get().exists:
+        case_doc = await _run_blocking(case_ref.get)
+        if not case_doc.exists:
             raise HTTPException(status_code=404, detail="Case not found")
 
     # Read file bytes
@@ -906,24 +1005,33 @@ async def upload_evidence_file(
     if not api_key:
         raise HTTPException(status_code=500, detail="Missing GEMINI_API_KEY")
 
-    client = genai.Client(api_key=api_key)
+    client = get_gemini_client(api_key)
     try:
-        file_uri = _upload_to_gemini_file_api(
-            client, file.filename or "upload", file_bytes, mime_type
+        file_uri = await _run_gemini(
+            _upload_to_gemini_file_api, client, file.filename or "upload", file_bytes, mime_type
         )
 
         evidence_id = None
         if db:
-            case_ref = db.collection("cases").document(caseId)
-            _ts, doc_ref = case_ref.collection("evidence").add({
-                "fileType": mime_type,
-                "storageUrl": file_uri,
-                "fileName": file.filename or "upload",
-                "extractedText": user_claim or f"Evidence file uploaded: {file.filename or 'upload'}",
-                "file_uri": file_uri,
-                "uploadedBy": uploaded_by,
-                "createdAt": firestore.SERVER_TIMESTAMP,
-            })
+            extracted_text = user_claim or f"Evidence file uploaded: {file.filename or 'upload'}"
+            doc_ref = case_ref.collection("evidence").document()
+
+            # Evidence doc + case-level summary/version land in one commit
+            def _save_evidence():
+                batch = db.batch()
+                batch.set(doc_ref, {
+                    "fileType": mime_type,
+                    "storageUrl": file_uri,
+                    "fileName": file.filename or "upload",
+                    "extractedText": extracted_text,
+                    "file_uri": file_uri,
+                    "uploadedBy": uploaded_by,
+                    "createdAt": firestore.SERVER_TIMESTAMP,
+                })
+                batch.update(case_ref, evidence_summary_update(case_ref, case_doc.to_dict(), doc_ref.id, extracted_text))
+                batch.commit()
+
+            await _run_blocking(_save_evidence)
             evidence_id = doc_ref.id
 
         return {
@@ -972,7 +1080,7 @@ async def audit_retry(caseId: str, messageId: str):
     floor_price = int(case_data.get("floorPrice", 0) or 0)
     defendant_max_offer = int(claim_amount * 0.5) if claim_amount > 0 else floor_price
 
-    evidence_docs = case_ref.collection("evidence").stream()
+    evidence_docs = case_ref.collection("evidence").select(["extractedText"]).limit(16).stream()
     evidence_texts = []
     for edoc in evidence_docs:
         extracted = (edoc.to_dict() or {}).get("extractedText")
@@ -983,7 +1091,7 @@ async def audit_retry(caseId: str, messageId: str):
     # Pull minimal legal context from indexed DB to guide rewrite
     from backend.rag.retrieval import retrieve_law
     retrieval_query = f"{case_type} {case_title} {original_content[:300]}"
-    legal_docs = retrieve_law(retrieval_query, use_agentic=False)
+    legal_docs = await _run_blocking(retrieve_law, retrieval_query, use_agentic=False)
     legal_context = "\n".join([
         f"- {d.get('law', 'Unknown')} Section {d.get('section', '?')}: {str(d.get('excerpt', ''))[:220]}"
         for d in legal_docs[:5]
@@ -1025,16 +1133,10 @@ Rules for this retry:
     regenerated_text = original_content
     regenerated_offer = msg_data.get("counter_offer_rm")
     try:
-        raw = call_gemini_with_retry(rewrite_prompt, max_retries=2, per_call_timeout=25)
-        cleaned = raw.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-        elif cleaned.startswith("```"):
-            cleaned = cleaned.split("```")[1].split("```")[0].strip()
-
+        raw = await _run_gemini(call_gemini_with_retry, rewrite_prompt, max_retries=2, per_call_timeout=25)
         try:
-            parsed = json.loads(cleaned)
-            regenerated_text = parsed.get("message", cleaned)
+            parsed = _parse_llm_json(raw)
+            regenerated_text = parsed.get("message", raw)
             if parsed.get("counter_offer_rm") is not None:
                 regenerated_offer = parsed.get("counter_offer_rm")
         except json.JSONDecodeError:
@@ -1043,7 +1145,7 @@ Rules for this retry:
         # Keep previous text if regeneration fails; return fresh audit result for visibility
         print(f"⚠️ Audit retry regeneration failed for {messageId}: {e}")
 
-    result = validate_turn(regenerated_text)
+    result = await _run_blocking(validate_turn, regenerated_text)
 
     try:
         field = "manual_retry_successes" if result["is_valid"] else "manual_retry_failures"
@@ -1175,7 +1277,7 @@ async def auditor_validate_turn(
     """
     try:
         # Call M2's auditor
-        result = validate_turn(agent_text)
+        result = await _run_blocking(validate_turn, agent_text)
         
         return {
             "is_valid": result["is_valid"],
@@ -1225,7 +1327,7 @@ async def export_court_filing(
         
         # Retrieve messages
         messages = []
-        messages_ref = case_ref.collection("messages").order_by("createdAt").stream()
+        messages_ref = case_ref.collection("messages").order_by("createdAt").select(HISTORY_FIELDS).stream()
         for msg_doc in messages_ref:
             msg_data = msg_doc.to_dict()
             messages.append({
@@ -1241,37 +1343,27 @@ async def export_court_filing(
         
         # Get legal context
         from backend.rag.retrieval import retrieve_law
-        legal_docs = retrieve_law(case_data.get('title', ''))
+        legal_docs = await _run_blocking(retrieve_law, case_data.get('title', ''))
         legal_context = "\n".join([
             f"- {d['law']} s.{d['section']}: {d['excerpt'][:200]}"
             for d in legal_docs
         ])
         
         # Build prompt
-        filing_prompt = COURT_FILING_PROMPT.replace(
-            "{case_facts}", f"Case: {case_data.get('title')}"
-        ).replace(
-            "{conversation_history}", conversation_history
-        ).replace(
-            "{legal_context}", legal_context
-        ).replace(
-            "{round_number}", str(len(messages))
+        filing_prompt = _fill_template(
+            COURT_FILING_PROMPT,
+            case_facts=f"Case: {case_data.get('title')}",
+            conversation_history=conversation_history,
+            legal_context=legal_context,
+            round_number=len(messages),
         )
         
         # Generate filing (sync call — run in thread to avoid blocking event loop)
-        import asyncio
-        loop = asyncio.get_event_loop()
-        raw_response = await loop.run_in_executor(None, call_gemini_with_retry, filing_prompt)
+        raw_response = await _run_gemini(call_gemini_with_retry, filing_prompt)
         
         # Parse JSON
         try:
-            cleaned = raw_response.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            elif cleaned.startswith("```"):
-                cleaned = cleaned.split("```")[1].split("```")[0].strip()
-
-            filing_json = json.loads(cleaned)
+            filing_json = _parse_llm_json(raw_response)
             return CourtFilingResponse(
                 plaintiff_details=filing_json.get("plaintiff_details", "User (Plaintiff)"),
                 defendant_details=filing_json.get("defendant_details", "Opponent (Defendant)"),
@@ -1372,11 +1464,9 @@ async def accept_final_offer(caseId: str):
         
         # Generate final settlement (sync function — run in thread to avoid blocking event loop)
         from backend.core.orchestrator import generate_mediator_settlement
-        import asyncio
 
         try:
-            loop = asyncio.get_event_loop()
-            settlement = await loop.run_in_executor(None, generate_mediator_settlement, caseId)
+            settlement = await _run_gemini(generate_mediator_settlement, caseId, case_data)
 
             try:
                 db.collection("analytics").document("settlement_metrics").set(
@@ -1404,7 +1494,7 @@ async def continue_negotiation(caseId: str):
     """User declines the favorable offer — game resumes as active.
     Returns immediately with default chips, then generates real chips
     in a background thread and writes them to Firestore nextChips."""
-    from backend.core.orchestrator import generate_strategy_chips, inject_mediator_guidance
+    from backend.core.orchestrator import generate_strategy_chips, inject_mediator_guidance, mediator_case_data
 
     if not db:
         raise HTTPException(status_code=500, detail="Firebase not available")
@@ -1444,7 +1534,7 @@ async def continue_negotiation(caseId: str):
 
             def _load_history():
                 h = []
-                for msg_doc in messages_ref.order_by("createdAt").stream():
+                for msg_doc in messages_ref.order_by("createdAt").select(HISTORY_FIELDS).stream():
                     md = msg_doc.to_dict()
                     h.append({
                         "role": md.get("role"),
@@ -1458,7 +1548,7 @@ async def continue_negotiation(caseId: str):
             # Run deferred mediator if it was skipped because the game was paused
             if needs_mediator:
                 print(f"⏩ [Continue] Running deferred mediator for case {caseId}")
-                inject_mediator_guidance(caseId, case_data, history)
+                inject_mediator_guidance(caseId, mediator_case_data(case_data), history)
                 case_ref.update({"mediatorPhase": False})
                 # Reload history so chips are generated with the mediator message included
                 history = _load_history()
@@ -1514,7 +1604,7 @@ async def generate_settlement_pdf(caseId: str):
 
     # Get messages
     messages = []
-    messages_ref = case_ref.collection("messages").order_by("createdAt").stream()
+    messages_ref = case_ref.collection("messages").order_by("createdAt").select(OFFER_HISTORY_FIELDS).stream()
     for msg_doc in messages_ref:
         msg_data = msg_doc.to_dict()
         messages.append({
@@ -1542,35 +1632,23 @@ async def generate_settlement_pdf(caseId: str):
         defendant_offers = [m.get("counter_offer_rm") for m in messages if m.get("role") == "defendant" and m.get("counter_offer_rm")]
         settlement_amount = defendant_offers[-1] if defendant_offers else 0
 
-    prompt = SETTLEMENT_AGREEMENT_PROMPT.replace(
-        "{case_title}", case_data.get("title", "Dispute")
-    ).replace(
-        "{case_type}", case_data.get("caseType", "")
-    ).replace(
-        "{plaintiff_name}", case_data.get("plaintiffDisplayName") or "Claimant"
-    ).replace(
-        "{defendant_name}", case_data.get("defendantDisplayName") or "Respondent"
-    ).replace(
-        "{claim_amount}", str(case_data.get("amount", 0))
-    ).replace(
-        "{settlement_amount}", str(settlement_amount)
-    ).replace(
-        "{negotiation_summary}", negotiation_summary
-    ).replace(
-        "{messages_history}", messages_history
+    prompt = _fill_template(
+        SETTLEMENT_AGREEMENT_PROMPT,
+        case_title=case_data.get("title", "Dispute"),
+        case_type=case_data.get("caseType", ""),
+        plaintiff_name=case_data.get("plaintiffDisplayName") or "Claimant",
+        defendant_name=case_data.get("defendantDisplayName") or "Respondent",
+        claim_amount=case_data.get("amount", 0),
+        settlement_amount=settlement_amount,
+        negotiation_summary=negotiation_summary,
+        messages_history=messages_history,
     )
 
-    import asyncio
     try:
-        loop = asyncio.get_event_loop()
-        html_response = await loop.run_in_executor(None, call_gemini_with_retry, prompt)
+        html_response = await _run_gemini(call_gemini_with_retry, prompt)
 
         # Clean up: strip markdown fencing if present
-        html_clean = html_response.strip()
-        if html_clean.startswith("```html"):
-            html_clean = html_clean.split("```html", 1)[1].rsplit("```", 1)[0].strip()
-        elif html_clean.startswith("```"):
-            html_clean = html_clean.split("```", 1)[1].rsplit("```", 1)[0].strip()
+        html_clean = _strip_code_fence(html_response)
 
         return {"html": html_clean}
     except Exception as e:
@@ -1597,7 +1675,7 @@ async def generate_deadlock_pdf(caseId: str):
 
     # Get messages
     messages = []
-    messages_ref = case_ref.collection("messages").order_by("createdAt").stream()
+    messages_ref = case_ref.collection("messages").order_by("createdAt").select(OFFER_HISTORY_FIELDS).stream()
     for msg_doc in messages_ref:
         msg_data = msg_doc.to_dict()
         messages.append({
@@ -1623,44 +1701,30 @@ async def generate_deadlock_pdf(caseId: str):
 
     # Get legal context
     from backend.rag.retrieval import retrieve_law
-    legal_docs = retrieve_law(case_data.get("title", ""), use_agentic=False)
+    legal_docs = await _run_blocking(retrieve_law, case_data.get("title", ""), use_agentic=False)
     legal_context = "\n".join([
         f"- {d['law']} s.{d['section']}: {d['excerpt'][:200]}"
         for d in legal_docs
     ]) if legal_docs else "No specific laws retrieved."
 
-    prompt = DEADLOCK_COURT_FILING_HTML_PROMPT.replace(
-        "{case_title}", case_data.get("title", "Dispute")
-    ).replace(
-        "{case_type}", case_data.get("caseType", "")
-    ).replace(
-        "{plaintiff_name}", case_data.get("plaintiffDisplayName") or "Claimant"
-    ).replace(
-        "{defendant_name}", case_data.get("defendantDisplayName") or "Respondent"
-    ).replace(
-        "{claim_amount}", str(case_data.get("amount", 0))
-    ).replace(
-        "{plaintiff_final_offer}", str(plaintiff_offers[-1] if plaintiff_offers else 0)
-    ).replace(
-        "{defendant_final_offer}", str(defendant_offers[-1] if defendant_offers else 0)
-    ).replace(
-        "{negotiation_summary}", negotiation_summary
-    ).replace(
-        "{messages_history}", messages_history
-    ).replace(
-        "{legal_context}", legal_context
+    prompt = _fill_template(
+        DEADLOCK_COURT_FILING_HTML_PROMPT,
+        case_title=case_data.get("title", "Dispute"),
+        case_type=case_data.get("caseType", ""),
+        plaintiff_name=case_data.get("plaintiffDisplayName") or "Claimant",
+        defendant_name=case_data.get("defendantDisplayName") or "Respondent",
+        claim_amount=case_data.get("amount", 0),
+        plaintiff_final_offer=plaintiff_offers[-1] if plaintiff_offers else 0,
+        defendant_final_offer=defendant_offers[-1] if defendant_offers else 0,
+        negotiation_summary=negotiation_summary,
+        messages_history=messages_history,
+        legal_context=legal_context,
     )
 
-    import asyncio
     try:
-        loop = asyncio.get_event_loop()
-        html_response = await loop.run_in_executor(None, call_gemini_with_retry, prompt)
-
-        html_clean = html_response.strip()
-        if html_clean.startswith("```html"):
-            html_clean = html_clean.split("```html", 1)[1].rsplit("```", 1)[0].strip()
-        elif html_clean.startswith("```"):
-            html_clean = html_clean.split("```", 1)[1].rsplit("```", 1)[0].strip()
+        html_response = await _run_gemini(call_gemini_with_retry, prompt)
+
+        html_clean = _strip_code_fence(html_response)
 
         return {"html": html_clean}
     except Exception as e:
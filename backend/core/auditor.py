@@ -35,6 +35,15 @@ def _get_auditor_clients():
     return _auditor_index, _auditor_embeddings
 
 
+# Every citation pattern below needs a section/sec/s.<n> or "order <n>" token
+_CITATION_HINT = re.compile(r"\b(?:sec(?:tion)?|s\.?\s*\d|order\s+\d)", re.IGNORECASE)
+
+
+def may_contain_citations(agent_text: str) -> bool:
+    """Cheap pre-check — False means extract_citations_with_regex would find nothing."""
+    return bool(agent_text) and _CITATION_HINT.search(agent_text) is not None
+
+
 def _normalize(text: str) -> str:
     return re.sub(r"\s+", " ", text.lower()).strip()
 
@@ -196,7 +205,7 @@ def validate_turn(agent_text: str) -> Dict[str, Any]:
     M3 should call this function.
     Output contract kept compatible with existing flow.
     """
-    citations_found = extract_citations_with_regex(agent_text)
+    citations_found = extract_citations_with_regex(agent_text) if may_contain_citations(agent_text) else []
 
     if not citations_found:
         return {
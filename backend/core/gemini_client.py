@@ -0,0 +1,30 @@
+"""
+Process-wide Gemini client.
+Every generate_content call and Files API upload goes through one genai.Client,
+so they share its HTTP connection pool (keep-alive, no per-call TLS handshake).
+"""
+import os
+import threading
+from typing import Optional
+
+from google import genai
+
+# Upper bound for a single HTTP request. Orchestrator calls use shorter per-call
+# timeouts; this only stops abandoned attempts from holding a pool thread forever.
+GEMINI_HTTP_TIMEOUT_MS = int(os.getenv("GEMINI_HTTP_TIMEOUT_MS", "120000"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: Optional[str] = None) -> genai.Client:
+    """Shared client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"),
+                    http_options={"timeout": GEMINI_HTTP_TIMEOUT_MS},
+                )
+    return _client
@@ -0,0 +1,44 @@
+"""
+Non-blocking logging for the negotiation backend.
+Records go onto an in-memory queue; a single background QueueListener thread
+does the actual stderr write, so worker threads never wait on the stdout/
+stderr lock or a slow container log driver.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s %(levelname)s %(message)s")
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def _ensure_listener() -> None:
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger("backend")
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the queue-backed "backend" hierarchy."""
+    _ensure_listener()
+    if not name.startswith("backend"):
+        name = f"backend.{name}"
+    return logging.getLogger(name)
@@ -4,15 +4,25 @@ Implements basic 2-turn negotiation: Plaintiff -> Defendant -> End
 Phase 1.5: RAG-enabled negotiation
 Phase 2: Turn-based negotiation with auditor, TTS, and multi-round support
 Model using Gemini 2.5 Flash due to queries timing out with Gemini 3 Pro Preview (likely due to model size and complexity of Phase 2)
+Perf note: turns are IO-bound on Firestore, Gemini and TTS RPCs. Do not JIT functions here
+with Numba — compile time on first call outweighs any savings on this glue code. Overlap and
+cache RPCs instead (shared pools, TTLCache). If numeric helpers ever grow hot (settlement
+math, ceilings), put them in their own module where @njit(cache=True) can amortize.
 """
 import os
 import time
-from typing import Optional, Dict, Any, List
+import functools
+import io
+import itertools
+import operator
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from firebase_admin import firestore, storage
-from google import genai
 from google.genai import types
 import json
 import re
+import uuid
+import hashlib
 from backend.logic.neurosymbolic import evaluate_game_state
 
 # =====================================================================
@@ -21,11 +31,14 @@ from backend.logic.neurosymbolic import evaluate_game_state
 from backend.prompts.plaintiff import build_plaintiff_prompt
 from backend.prompts.defendant import build_defendant_prompt
 from backend.prompts.mediator import build_mediator_prompt  # For Phase 2
-from backend.rag.retrieval import retrieve_law
-from backend.core.auditor import validate_turn
+from backend.rag.retrieval import format_history_for_prompt, retrieve_law
+from backend.core.auditor import validate_turn, may_contain_citations
 from backend.logic.evidence import validate_evidence
 from backend.prompts.chips import generate_chips_prompt
-from backend.tts.voice import synthesize_audio_bytes
+from backend.tts.voice import synthesize_audio_bytes, get_voice_for_role
+from backend.core.ttl_cache import TTLCache
+from backend.core.logging_setup import get_logger
+from backend.core.gemini_client import get_gemini_client
 import concurrent.futures
 import threading
 
@@ -36,8 +49,13 @@ try:
 except ImportError:
     GRAPH_AVAILABLE = False
 
+log = get_logger("negotiation")
+
+# Server-side write-time sentinel, bound once for the many message/case writes below
+_SERVER_TS = firestore.SERVER_TIMESTAMP
+
 # Initialize Gemini client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+client = get_gemini_client()
 PRIMARY_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "gemini-2.5-flash-lite")
 
@@ -45,11 +63,121 @@ FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "gemini-2.5-flash-lite")
 # Phase 2 Constants
 MAX_ROUNDS = 4
 MAX_AUDITOR_RETRIES = 2
+# Case status written for each end-of-turn game state (anything else stays "active")
+_GAME_TO_STATUS = {
+    "settled": "done",
+    "pending_decision": "pending_decision",
+    "pending_accept": "pending_accept",
+}
+_OPPOSITE_ROLE = {"plaintiff": "defendant", "defendant": "plaintiff"}
 TURN_TOTAL_TIMEOUT_SEC = 240
+HISTORY_WINDOW = 8  # Newest messages loaded per turn; prompts only use the last 4-6
+RAG_TIMEOUT_SEC = 45
+HISTORY_FIELDS = ["role", "content", "round"]  # Message fields prompts read (field mask)
+HISTORY_CONTENT_CAP = 1500  # Per-message char cap in negotiation prompt history
+# Evidence fields the turn prompts use; prompts take at most 8 texts + 5 file parts
+EVIDENCE_PROMPT_FIELDS = ["extractedText", "file_uri", "fileType"]
+EVIDENCE_QUERY_LIMIT = 16
+
+# Shared pools, replacing per-call executors. Tasks in one tier only ever wait on
+# the tier below, so a saturated pool can never deadlock on its own futures:
+#   _TURN_POOL  turn side work (Firestore reads, RAG, audit, chips, mediator)
+#   _LLM_POOL   time-boxed call_gemini_with_retry wrappers (replies, chips)
+#   _CALL_POOL  single Gemini attempts / retrieve_law — never wait on a pool;
+#               sized for attempts abandoned on timeout that are still running
+_TURN_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="turn-io")
+_LLM_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm")
+_CALL_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-call")
+# Role audio (TTS + upload) for plaintiff/defendant/mediator runs side by side,
+# capped at 3 concurrent syntheses to stay under TTS rate limits
+_TTS_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=3, thread_name_prefix="tts")
+
+# Turn evidence (texts, file parts) per case, tagged with the case's evidenceVersion
+# so uploads invalidate it — 5min TTL
+_EVIDENCE_CACHE = TTLCache(maxsize=1024, ttl=300)
+
+# Explicit Gemini caches of a case's evidence files, keyed by (case_id, evidenceVersion).
+# Entries expire locally 5min before Gemini drops them, so turns never reference a dead cache
+EVIDENCE_CONTEXT_CACHE_TTL_SEC = 3600
+_EVIDENCE_CONTEXT_CACHES = TTLCache(maxsize=512, ttl=EVIDENCE_CONTEXT_CACHE_TTL_SEC - 300)
+_EVIDENCE_CONTEXT_PENDING = set()
+_EVIDENCE_CONTEXT_LOCK = threading.Lock()
+
+# Per-turn RAG results keyed by (case_type, case_title, directive, recent history) — 1h TTL
+_RAG_CACHE = TTLCache(maxsize=2048, ttl=3600)
+
+# Settlement legal context (formatted) keyed by normalized case title — 30min TTL
+_SETTLEMENT_LAW_CACHE = TTLCache(maxsize=1024, ttl=1800)
+
+# Formatted mediator guidance keyed by case id + exact prompt — 24h TTL.
+# Re-runs of the same mediator step (client retry, deferred mediator after a pause)
+# reuse it; guidance never crosses cases or conversation states.
+_MEDIATOR_CACHE = TTLCache(maxsize=512, ttl=86400)
+# Recent mediator failures per case — repeat calls during a Gemini outage reuse the
+# fallback instead of stacking more retries on the same case
+_MEDIATOR_FAIL_CACHE = TTLCache(maxsize=2048, ttl=30)
+
+# Negotiation replies keyed by the exact prompt + evidence files — 24h TTL.
+# A repeated turn state (client retry, same directive after a failed save)
+# reuses the reply instead of another Gemini call.
+_REPLY_CACHE = TTLCache(maxsize=1024, ttl=86400)
+
+# Validated strategy chips keyed by the exact chips prompt — 1h TTL. The prompt
+# already carries role, round, offer and history tail, so a hit is the same turn.
+_CHIPS_CACHE = TTLCache(maxsize=1024, ttl=3600)
+
+# Structured-output schemas (Gemini JSON mode) — responses arrive as bare, valid JSON
+NEGOTIATION_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "message": {"type": "STRING"},
+        "counter_offer_rm": {"type": "INTEGER", "nullable": True},
+    },
+    "required": ["message", "counter_offer_rm"],
+}
+MEDIATOR_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "summary": {"type": "STRING"},
+        "recommended_settlement_rm": {"type": "NUMBER"},
+        "confidence": {"type": "NUMBER"},
+    },
+    "required": ["summary", "recommended_settlement_rm", "confidence"],
+}
+# Final settlement mirrors api_models.Settlement (citations optional)
+SETTLEMENT_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        **MEDIATOR_RESPONSE_SCHEMA["properties"],
+        "citations": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "law": {"type": "STRING"},
+                    "section": {"type": "STRING"},
+                    "excerpt": {"type": "STRING"},
+                },
+                "required": ["law", "section", "excerpt"],
+            },
+        },
+    },
+    "required": MEDIATOR_RESPONSE_SCHEMA["required"],
+}
+
+# Firestore client — created once on first use (the Firebase app is initialized after import)
+_db = None
+_db_lock = threading.Lock()
+
 
 def get_db():
-    """Get Firestore client."""
-    return firestore.client()
+    """Get the shared Firestore client."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = firestore.client()
+    return _db
 
 
 def _log_analytics(doc_id: str, field: str) -> None:
@@ -60,7 +188,286 @@ def _log_analytics(doc_id: str, field: str) -> None:
             {field: firestore.Increment(1)}, merge=True
         )
     except Exception as e:
-        print(f"⚠️ Analytics write skipped: {e}")
+        log.warning("⚠️ Analytics write skipped: %s", e)
+
+
+def _commit_turn_batch(
+    db,
+    case_ref,
+    message_payloads: List[Dict[str, Any]],
+    case_updates: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Write a turn's messages and case-level updates in a single Firestore commit.
+
+    Every message in one batch resolves to the same SERVER_TIMESTAMP, so doc IDs
+    carry a zero-padded sequence to keep createdAt ties in write order
+    (Firestore breaks orderBy ties by document ID).
+    """
+    batch = db.batch()
+    messages_ref = case_ref.collection("messages")
+    batch_prefix = f"{time.time_ns():020d}"
+    for seq, payload in enumerate(message_payloads):
+        doc_id = f"{batch_prefix}-{seq:02d}-{uuid.uuid4().hex[:8]}"
+        batch.set(messages_ref.document(doc_id), payload)
+    if case_updates:
+        batch.update(case_ref, case_updates)
+    batch.commit()
+
+
+@firestore.transactional
+def _write_mediator_once(transaction, case_ref, message_ref, payload: Dict[str, Any]) -> bool:
+    """Write the mediator message unless the case is already flagged — at most one per case."""
+    snapshot = case_ref.get(transaction=transaction)
+    if (snapshot.to_dict() or {}).get("mediatorInjected"):
+        return False
+    transaction.set(message_ref, payload)
+    transaction.update(case_ref, {"mediatorInjected": True})
+    return True
+
+
+def _attach_mediator_audio(message_ref, audio_future: concurrent.futures.Future) -> None:
+    """Patch audio_url onto the saved mediator message once synthesis finishes."""
+    def _on_done(fut):
+        try:
+            audio_url = fut.result()
+            if audio_url:
+                message_ref.update({"audio_url": audio_url})
+        except Exception as e:
+            log.warning("⚠️  Failed to attach mediator audio: %s", e)
+
+    audio_future.add_done_callback(_on_done)
+
+
+def _load_recent_history(messages_ref, limit: int = HISTORY_WINDOW) -> List[Dict[str, Any]]:
+    """Load the newest `limit` messages, returned in chronological order."""
+    recent_docs = (
+        messages_ref.order_by("createdAt", direction=firestore.Query.DESCENDING)
+        .select(HISTORY_FIELDS)
+        .limit(limit)
+        .stream()
+    )
+    history = []
+    for msg_doc in recent_docs:
+        msg_data = msg_doc.to_dict()
+        history.append({
+            "role": msg_data.get("role"),
+            "content": msg_data.get("content"),
+            "round": msg_data.get("round"),
+        })
+    history.reverse()
+    return history
+
+
+def _derive_legacy_counters(messages_ref):
+    """(plaintiff message count, mediator present) for cases created before the counters existed."""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    count_result = (
+        messages_ref.where(filter=FieldFilter("role", "==", "plaintiff")).count().get()
+    )
+    plaintiff_count = int(count_result[0][0].value)
+    return plaintiff_count, _has_mediator_message(messages_ref)
+
+
+def _has_mediator_message(messages_ref) -> bool:
+    """Single-doc probe for a mediator message (cases without the mediatorInjected flag)."""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    mediator_docs = (
+        messages_ref.where(filter=FieldFilter("role", "==", "mediator")).limit(1).get()
+    )
+    return len(mediator_docs) > 0
+
+
+def evidence_summary_update(case_ref, case_data: dict, evidence_id: str, extracted_text: Optional[str]) -> Dict[str, Any]:
+    """Case-doc update for one new evidence item.
+
+    Bumps evidenceVersion (invalidates cached turn evidence) and appends the
+    clipped extract, if any, to the evidenceSummary aggregate as {id, text} so
+    identical extracts stay separate entries. Cases created before the aggregate
+    existed get it seeded from the evidence subcollection first; otherwise the
+    first append would hide every earlier extract from the settlement prompt.
+    """
+    update: Dict[str, Any] = {"evidenceVersion": firestore.Increment(1)}
+    entry = {"id": evidence_id, "text": _clip_text(extracted_text, 500)} if extracted_text else None
+    if "evidenceSummary" not in case_data:
+        entries = []
+        for edoc in case_ref.collection("evidence").order_by("createdAt").select(["extractedText"]).stream():
+            text = edoc.to_dict().get("extractedText")
+            if text:
+                entries.append({"id": edoc.id, "text": _clip_text(text, 500)})
+        if entry:
+            entries.append(entry)
+        update["evidenceSummary"] = entries
+    elif entry:
+        update["evidenceSummary"] = firestore.ArrayUnion([entry])
+    return update
+
+
+def _render_transcript(messages_ref) -> str:
+    """Full conversation as "[Round n] ROLE: content" lines, written straight from the stream."""
+    buf = io.StringIO()
+    w = buf.write
+    first = True
+    for msg_doc in messages_ref.order_by("createdAt").select(HISTORY_FIELDS).stream():
+        msg_data = msg_doc.to_dict()
+        if not first:
+            w("\n")
+        first = False
+        w("[Round ")
+        w(str(msg_data.get("round")))
+        w("] ")
+        w((msg_data.get("role") or "unknown").upper())
+        w(": ")
+        w(msg_data.get("content") or "")
+    return buf.getvalue()
+
+
+def _load_turn_evidence(case_ref):
+    """Evidence texts + (file_uri, mime_type) parts for Gemini multipart."""
+    evidence_docs = (
+        case_ref.collection("evidence")
+        .select(EVIDENCE_PROMPT_FIELDS)
+        .limit(EVIDENCE_QUERY_LIMIT)
+        .stream()
+    )
+    evidence_texts = []
+    evidence_file_parts = []
+    for edoc in evidence_docs:
+        evidence_data = edoc.to_dict()
+        extracted = evidence_data.get("extractedText")
+        if extracted:
+            evidence_texts.append(extracted)
+        # Collect Gemini File API URIs with their mime types
+        furi = evidence_data.get("file_uri")
+        fmime = evidence_data.get("fileType")
+        if furi and fmime:
+            evidence_file_parts.append((furi, fmime))
+    return evidence_texts, evidence_file_parts
+
+
+def _turn_evidence(case_id: str, case_ref, case_data: dict, cached, evidence_future):
+    """Turn evidence, reusing the cached copy while the case's evidenceVersion is unchanged.
+
+    `evidence_future` is the concurrent load started on a cache miss (None on a hit).
+    """
+    version = case_data.get("evidenceVersion", 0)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+    if evidence_future is not None:
+        evidence_texts, evidence_file_parts = evidence_future.result()
+    else:
+        evidence_texts, evidence_file_parts = _load_turn_evidence(case_ref)
+    _EVIDENCE_CACHE.set(case_id, (version, evidence_texts, evidence_file_parts))
+    return evidence_texts, evidence_file_parts
+
+
+def _evidence_context_cache(case_id: str, version, file_parts: Optional[List[tuple]]) -> Optional[str]:
+    """Name of the explicit Gemini cache holding this case's evidence files, if ready.
+
+    The first turn after an upload sends the files inline and starts building
+    the cache in the background; later turns reference it instead of resending
+    the files (and paying their input tokens) on every call.
+    """
+    if not file_parts:
+        return None
+    key = (case_id, version)
+    name = _EVIDENCE_CONTEXT_CACHES.get(key)
+    if name is not None:
+        return name or None  # "" marks a failed create — keep sending inline
+    with _EVIDENCE_CONTEXT_LOCK:
+        if key in _EVIDENCE_CONTEXT_PENDING:
+            return None
+        _EVIDENCE_CONTEXT_PENDING.add(key)
+    _TURN_POOL.submit(_create_evidence_context_cache, key, list(file_parts))
+    return None
+
+
+def _create_evidence_context_cache(key: tuple, file_parts: List[tuple]) -> None:
+    try:
+        cache = client.caches.create(
+            model=PRIMARY_MODEL,
+            config=types.CreateCachedContentConfig(
+                contents=[types.Content(role="user", parts=[
+                    types.Part.from_uri(file_uri=uri, mime_type=mime) for uri, mime in file_parts
+                ])],
+                ttl=f"{EVIDENCE_CONTEXT_CACHE_TTL_SEC}s",
+            ),
+        )
+        _EVIDENCE_CONTEXT_CACHES.set(key, cache.name)
+        log.info("💾 Evidence context cache ready for %s (%s files)", key[0], len(file_parts))
+    except Exception as e:
+        # e.g. below the model's minimum cacheable size — don't retry every turn
+        log.info("ℹ️  Evidence context cache skipped for %s: %s", key[0], e)
+        _EVIDENCE_CONTEXT_CACHES.set(key, "")
+    finally:
+        with _EVIDENCE_CONTEXT_LOCK:
+            _EVIDENCE_CONTEXT_PENDING.discard(key)
+
+
+def _retrieve_turn_laws(
+    case_type: str,
+    case_title: str,
+    user_message: str,
+    history: List[Dict[str, Any]],
+    emit,
+) -> List[Dict[str, Any]]:
+    """RAG lookup for a negotiation turn, served from _RAG_CACHE when the same
+    directive and recent history repeat (client retry, replayed turn).
+
+    Misses run retrieve_law under a hard timeout; only non-empty results are
+    cached so timeouts and failures are retried on the next turn.
+    """
+    # Agentic sub-queries are generated from the history tail, so it is part of the key —
+    # otherwise every directive-less turn would reuse the first turn's laws
+    cache_key = hashlib.sha256(
+        f"{case_type}|{case_title}|{user_message or ''}|{format_history_for_prompt(history)}".encode("utf-8")
+    ).hexdigest()
+    cached = _RAG_CACHE.get(cache_key)
+    if cached is not None:
+        log.info("📚 RAG cache hit (%s references)", len(cached))
+        return cached
+
+    rag_parts = [case_type, case_title]
+    if user_message:
+        rag_parts.append(user_message)
+    rag_query = " ".join(rag_parts)
+    legal_docs = []
+    try:
+        future = _CALL_POOL.submit(
+            retrieve_law,
+            query=rag_query,
+            history=history,
+            use_agentic=True,
+        )
+        try:
+            legal_docs = future.result(timeout=RAG_TIMEOUT_SEC)
+        finally:
+            future.cancel()
+    except concurrent.futures.TimeoutError:
+        log.info("⏰ RAG search timed out after %ss, proceeding without legal context", RAG_TIMEOUT_SEC)
+        emit("rag_warn", "\u26a0 Legal search timed out — proceeding without case law")
+        return []
+    except Exception as e:
+        log.warning("⚠️  RAG search error: %s, proceeding without legal context", e)
+        emit("rag_warn", f"\u26a0 Legal search failed: {str(e)[:80]} — proceeding anyway")
+        return []
+
+    if legal_docs:
+        _RAG_CACHE.set(cache_key, legal_docs)
+    return legal_docs
+
+
+_LAW_FIELDS = operator.itemgetter("law", "section", "excerpt")
+
+
+def _format_turn_legal_context(legal_docs: List[Dict[str, Any]]) -> str:
+    """Prompt lines for retrieved laws, excerpts capped at 300 chars."""
+    # join() builds a list from a generator anyway, so a list comp is the faster input
+    return "\n".join([
+        f"- {law} Section {section}: {excerpt[:300]}..."
+        for law, section, excerpt in map(_LAW_FIELDS, legal_docs)
+    ])
 
 
 def _clip_text(value: str, limit: int) -> str:
@@ -71,63 +478,244 @@ def _clip_text(value: str, limit: int) -> str:
     return value[:limit] + "..."
 
 
-def _call_gemini_once(prompt: str, model_name: str, file_parts: Optional[List[tuple]] = None) -> str:
+def _render_evidence_context(texts, limit: int = 8, per_cap: int = 700, total_cap: int = 6000) -> str:
+    """Up to `limit` evidence texts, each clipped to `per_cap`, one per line.
+
+    Stops at a total size budget. Pieces are written straight into one buffer
+    (no per-item "clipped + '...'" strings), and extracts past the budget are
+    never sliced.
+    """
+    buf = io.StringIO()
+    w = buf.write
+    used = 0
+    taken = 0
+    for text in texts:
+        if taken >= limit:
+            break
+        if not text:
+            continue
+        clipped = len(text) > per_cap
+        size = per_cap + 3 if clipped else len(text)
+        if used + size > total_cap:
+            break
+        if taken:
+            w("\n")
+        if clipped:
+            w(text[:per_cap])
+            w("...")
+        else:
+            w(text)
+        used += size + 1
+        taken += 1
+    return buf.getvalue() or "No evidence provided."
+
+
+def _call_gemini_once(
+    prompt: str,
+    model_name: str,
+    file_parts: Optional[List[tuple]] = None,
+    response_schema: Optional[dict] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    cached_content: Optional[str] = None,
+) -> str:
     """Single Gemini API call (used inside thread for timeout).
 
     Args:
         prompt: The text prompt
         model_name: Gemini model ID
         file_parts: Optional list of (file_uri, mime_type) tuples from Gemini Files API
+        response_schema: Optional response schema; enables JSON mode so the
+            reply is valid JSON without fences or surrounding prose
+        on_token: Optional callback; when set the response is streamed and
+            each text chunk is forwarded as it arrives
+        cached_content: Optional explicit cache name (created for model_name)
+            already holding the evidence files; file_parts are then not resent
     """
+    config_kwargs: Dict[str, Any] = {}
+    if response_schema is not None:
+        config_kwargs.update(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+    if cached_content:
+        config_kwargs["cached_content"] = cached_content
+        file_parts = None
+    config = types.GenerateContentConfig(**config_kwargs) if config_kwargs else None
+
+    def _generate(contents) -> str:
+        if on_token is None:
+            return client.models.generate_content(
+                model=model_name,
+                contents=contents,
+                config=config,
+            ).text
+        # Accumulate into a list — `buf += piece` is quadratic on long replies
+        chunks = []
+        for chunk in client.models.generate_content_stream(
+            model=model_name,
+            contents=contents,
+            config=config,
+        ):
+            piece = chunk.text
+            if not piece:
+                continue
+            chunks.append(piece)
+            on_token(piece)
+            # In JSON mode, stop as soon as the object is complete. Only try
+            # to parse when the chunk could close it, not on every fragment.
+            tail = piece.rstrip()
+            if response_schema is not None and tail and tail[-1] in "}]":
+                joined = "".join(chunks)
+                try:
+                    json.loads(joined)
+                except json.JSONDecodeError:
+                    continue
+                return joined
+        return "".join(chunks)
+
     if file_parts:
-        parts = [types.Part.from_text(text=prompt)]
+        # Evidence files are identical on every turn of a case, so they go first:
+        # Gemini's implicit prefix cache only reuses an exactly matching prefix
+        parts = []
         for uri, mime in file_parts:
             try:
                 parts.append(types.Part.from_uri(file_uri=uri, mime_type=mime))
             except Exception as e:
-                print(f"⚠️  Failed to attach URI {uri[:60]}: {e}, skipping")
+                log.warning("⚠️  Failed to attach URI %s: %s, skipping", uri[:60], e)
+        parts.append(types.Part.from_text(text=prompt))
         try:
-            response = client.models.generate_content(
-                model=model_name,
-                contents=[types.Content(role="user", parts=parts)],
-            )
-            return response.text
+            return _generate([types.Content(role="user", parts=parts)])
         except Exception as e:
             if "400" in str(e) or "INVALID_ARGUMENT" in str(e):
-                print(f"⚠️  Multipart call failed ({e}), falling back to text-only")
+                log.warning("⚠️  Multipart call failed (%s), falling back to text-only", e)
                 # Fall through to text-only call below
             else:
                 raise
-    response = client.models.generate_content(
-        model=model_name,
-        contents=prompt
-    )
-    return response.text
+    return _generate(prompt)
+
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
 
 
 def _extract_json_from_text(text: str) -> str:
     """Extract a JSON object from raw LLM output.
 
     Handles three cases (in priority order):
-    1. Response wrapped in ```json ... ``` fences
-    2. Response wrapped in ``` ... ``` fences
+    1. Response wrapped in ```json ... ``` or ``` ... ``` fences
+    2. Bare JSON object (fast path — no regex scan)
     3. JSON object embedded anywhere in prose (LLM forgot to output ONLY JSON)
 
     Falls back to returning the original text unchanged so the caller's
     json.loads will still raise JSONDecodeError as before.
     """
     text = (text or "").strip()
-    if text.startswith("```json"):
-        return text.split("```json", 1)[1].split("```", 1)[0].strip()
     if text.startswith("```"):
-        return text.split("```", 1)[1].split("```", 1)[0].strip()
+        fenced = _FENCE_RE.match(text)
+        if fenced:
+            return fenced.group(1)
+    if text.startswith("{") and text.endswith("}"):
+        return text
     # Search for the outermost {...} anywhere in the text
-    match = re.search(r"\{.*\}", text, re.DOTALL)
+    match = _JSON_OBJECT_RE.search(text)
     if match:
         return match.group(0).strip()
     return text
 
 
+def _parse_llm_json(text: str) -> Any:
+    """Parse the JSON object in raw LLM output.
+
+    Uses raw_decode as a fallback so trailing prose after the object
+    (common in LLM replies) does not fail the parse. Raises JSONDecodeError
+    like json.loads when no object can be decoded.
+    """
+    cleaned = _extract_json_from_text(text)
+    try:
+        return _JSON_DECODER.decode(cleaned)
+    except json.JSONDecodeError:
+        start = cleaned.find("{")
+        if start < 0:
+            raise
+        parsed, _ = _JSON_DECODER.raw_decode(cleaned, start)
+        return parsed
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_role_prompt(role: str, case_items: tuple, current_round: int) -> str:
+    builder = build_defendant_prompt if role == "defendant" else build_plaintiff_prompt
+    return builder(case_data=dict(case_items), current_round=current_round)
+
+
+def _recent_shared_history(history: List[Dict[str, Any]], window: int = 6) -> tuple:
+    """Last `window` non-directive messages (directives are private to each side).
+
+    Only a small tail of history is walked, never the whole list.
+    """
+    return tuple(m for m in history[-(window + 2):] if m["role"] != "directive")[-window:]
+
+
+def _render_history(recent, cap: int = HISTORY_CONTENT_CAP) -> str:
+    """Prompt lines for recent messages, each capped at `cap` chars.
+
+    Each message renders the same wherever it sits in the window (no
+    re-summarising or relabelling), so consecutive turns repeat earlier lines
+    byte-for-byte. Keep it that way.
+    """
+    return "\n".join(
+        f"[{m['role'].upper()}]: {(m['content'] or '')[:cap]}"
+        for m in recent
+    )
+
+
+@dataclass(frozen=True)
+class PromptContext:
+    """Per-turn prompt inputs, formatted once and shared by the role prompts.
+
+    `facts` holds the sorted case_data_dict items, so it doubles as the
+    memoization key for the plaintiff/defendant base prompts.
+    """
+    facts: Tuple[Tuple[str, Any], ...]
+    recent: tuple
+    history_snippet: str
+
+    @classmethod
+    def build(cls, case_data_dict: dict, history: List[Dict[str, Any]]) -> "PromptContext":
+        recent = _recent_shared_history(history)
+        return cls(
+            facts=tuple(sorted(case_data_dict.items())),
+            recent=recent,
+            history_snippet=_render_history(recent),
+        )
+
+    @property
+    def evidence(self) -> str:
+        return dict(self.facts).get("evidence_summary", "")
+
+    @property
+    def legal(self) -> str:
+        return dict(self.facts).get("legal_context", "")
+
+    def with_message(self, message: Dict[str, Any], window: int = 6) -> "PromptContext":
+        """Same facts with one new message appended (e.g. after the plaintiff has spoken)."""
+        recent = (self.recent + (message,))[-window:]
+        return replace(self, recent=recent, history_snippet=_render_history(recent))
+
+    def role_prompt(self, role: str, current_round: int) -> str:
+        """Plaintiff/defendant base prompt, memoized on the case facts + round.
+
+        Case facts are stable across a negotiation, so retries and repeated
+        turns with the same legal context reuse the assembled prompt.
+        """
+        try:
+            return _cached_role_prompt(role, self.facts, current_round)
+        except TypeError:
+            # Unhashable field values — build uncached
+            builder = build_defendant_prompt if role == "defendant" else build_plaintiff_prompt
+            return builder(case_data=dict(self.facts), current_round=current_round)
+
+
 def _build_directive_section(user_message: str, role: str = "plaintiff") -> str:
     """Build the commander directive block injected into the LLM prompt."""
     if not user_message or not user_message.strip():
@@ -142,13 +730,19 @@ def _build_directive_section(user_message: str, role: str = "plaintiff") -> str:
     )
 
 
-def call_gemini_with_retry(prompt: str, max_retries: int = 2, per_call_timeout: int = 30, progress_callback=None, file_parts: Optional[List[tuple]] = None) -> str:
+def call_gemini_with_retry(prompt: str, max_retries: int = 2, per_call_timeout: int = 30, progress_callback=None, file_parts: Optional[List[tuple]] = None, response_schema: Optional[dict] = None, on_token: Optional[Callable[[str], None]] = None, evidence_cache: Optional[str] = None, on_restart: Optional[Callable[[], None]] = None) -> str:
     """Call Gemini API with retry + exponential backoff for rate limits.
-    Each individual call is capped at per_call_timeout seconds."""
+    Each individual call is capped at per_call_timeout seconds.
+    Pass response_schema to request structured JSON output, and on_token to
+    stream text chunks as they arrive (a "gemini_retry" progress event
+    signals that a new attempt restarts the stream; on_restart, if given, is
+    called before the new attempt's first chunk). evidence_cache is an
+    explicit cache of file_parts for PRIMARY_MODEL; fallback-model attempts
+    send the files inline instead."""
     def _emit(msg):
         if progress_callback:
             progress_callback("gemini_retry", msg)
-        print(msg)
+        log.info(msg)
 
     active_model = PRIMARY_MODEL
     fallback_used = False
@@ -157,12 +751,24 @@ def call_gemini_with_retry(prompt: str, max_retries: int = 2, per_call_timeout:
         try:
             if attempt > 0:
                 _emit(f"⏳ Retrying AI call (attempt {attempt+1}/{max_retries})...")
-            pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            future = pool.submit(_call_gemini_once, prompt, active_model, file_parts)
+                if on_restart is not None:
+                    on_restart()
+            # Stop forwarding chunks from an attempt once we stop waiting on it
+            attempt_done = threading.Event()
+            forward = None
+            if on_token is not None:
+                def forward(piece, _done=attempt_done):
+                    if not _done.is_set():
+                        on_token(piece)
+            cached_content = evidence_cache if active_model == PRIMARY_MODEL else None
+            future = _CALL_POOL.submit(
+                _call_gemini_once, prompt, active_model, file_parts, response_schema, forward, cached_content
+            )
             try:
                 return future.result(timeout=per_call_timeout)
             finally:
-                pool.shutdown(wait=False, cancel_futures=True)
+                attempt_done.set()
+                future.cancel()
         except concurrent.futures.TimeoutError:
             if not fallback_used and active_model != FALLBACK_MODEL:
                 fallback_used = True
@@ -186,6 +792,100 @@ def call_gemini_with_retry(prompt: str, max_retries: int = 2, per_call_timeout:
     raise Exception(f"Gemini API failed after {max_retries} retries (rate limited / timed out).")
 
 
+def _token_forwarder(progress_callback, step: str) -> Optional[Callable[[str], None]]:
+    """Adapt progress_callback into an on_token sink for streamed LLM output."""
+    if not progress_callback:
+        return None
+    return lambda piece: progress_callback(step, piece)
+
+
+def _generate_negotiation_reply(
+    prompt: str,
+    progress_callback=None,
+    file_parts: Optional[List[tuple]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    evidence_cache: Optional[str] = None,
+) -> str:
+    """Plaintiff/defendant JSON reply, served from _REPLY_CACHE when the turn state repeats.
+
+    An on_token sink with a restart() method (_EarlyRoleAudio) is reset whenever
+    a retry or fallback model restarts the stream.
+    """
+    key_material = prompt + "".join(f"|{uri}" for uri, _ in (file_parts or ()))
+    cache_key = hashlib.blake2b(key_material.encode("utf-8"), digest_size=16).hexdigest()
+    cached = _REPLY_CACHE.get(cache_key)
+    if cached is not None:
+        log.info("💾 Negotiation reply cache hit — skipped Gemini call")
+        if on_token is not None:
+            on_token(cached)
+        return cached
+
+    raw = call_gemini_with_retry(
+        prompt, 2, 30, progress_callback, file_parts, NEGOTIATION_RESPONSE_SCHEMA, on_token,
+        evidence_cache, getattr(on_token, "restart", None),
+    )
+    try:
+        _parse_llm_json(raw)
+    except json.JSONDecodeError:
+        return raw  # Malformed replies are not reused
+    _REPLY_CACHE.set(cache_key, raw)
+    return raw
+
+
+# Complete "message" string in a streamed negotiation reply (escapes included)
+_MESSAGE_FIELD_RE = re.compile(r'"message"\s*:\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+
+
+class _EarlyRoleAudio:
+    """on_token sink that starts role TTS once the streamed "message" string closes.
+
+    The message field comes first in NEGOTIATION_RESPONSE_SCHEMA, so synthesis
+    can overlap the rest of the stream (offer, JSON parsing, the save).
+    """
+
+    def __init__(self, case_id: str, round_num, role: str, on_token: Optional[Callable[[str], None]] = None):
+        self.case_id = case_id
+        self.round_num = round_num
+        self.role = role
+        self.on_token = on_token
+        self.chunks: List[str] = []
+        self.text: Optional[str] = None
+        self.future: Optional[concurrent.futures.Future] = None
+
+    def restart(self) -> None:
+        """A new attempt restarts the stream — drop the previous attempt's partial output."""
+        if self.future is not None:
+            self.future.cancel()  # Best effort; audio_future() re-synthesises on a mismatch anyway
+        self.chunks = []
+        self.text = None
+        self.future = None
+
+    def __call__(self, piece: str) -> None:
+        if self.on_token is not None:
+            self.on_token(piece)
+        self.chunks.append(piece)
+        if self.future is not None or '"' not in piece:
+            return
+        match = _MESSAGE_FIELD_RE.search("".join(self.chunks))
+        if not match:
+            return
+        try:
+            self.text = json.loads(f'"{match.group(1)}"')
+        except json.JSONDecodeError:
+            return
+        self.future = _TTS_POOL.submit(
+            generate_and_upload_role_audio, self.case_id, self.round_num, self.role, self.text
+        )
+
+    def audio_future(self, final_text: Optional[str]) -> concurrent.futures.Future:
+        """The early synthesis if it matches the final text, else a fresh one."""
+        if self.future is not None and self.text == final_text:
+            return self.future
+        return _TTS_POOL.submit(
+            generate_and_upload_role_audio, self.case_id, self.round_num, self.role, final_text
+        )
+
+
 def _default_chips(role: str, current_round: int) -> Dict[str, Any]:
     """Return contextual default chips by role + round instead of None."""
     if role == "defendant":
@@ -264,6 +964,11 @@ def _default_chips(role: str, current_round: int) -> Dict[str, Any]:
             }
 
 
+def _copy_chips(chips: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy with fresh option dicts, so cached chips never share state with a caller."""
+    return {**chips, "options": [dict(opt) for opt in chips["options"]]}
+
+
 def generate_strategy_chips(
     case_title: str,
     current_round: int,
@@ -278,50 +983,30 @@ def generate_strategy_chips(
         if not text:
             return None
 
-        if text.startswith("```json"):
-            text = text.split("```json", 1)[1].split("```", 1)[0].strip()
-        elif text.startswith("```"):
-            text = text.split("```", 1)[1].split("```", 1)[0].strip()
+        if text.startswith("```"):
+            fenced = _FENCE_RE.match(text)
+            if fenced:
+                text = fenced.group(1)
 
         if text.startswith("{") and text.endswith("}"):
             try:
-                parsed = json.loads(text)
+                parsed = _JSON_DECODER.decode(text)
                 if isinstance(parsed, dict):
                     return text
             except Exception:
                 pass
 
-        start_positions = [idx for idx, ch in enumerate(text) if ch == "{"]
-        for start in start_positions:
-            depth = 0
-            in_string = False
-            escape = False
-
-            for idx in range(start, len(text)):
-                ch = text[idx]
-                if in_string:
-                    if escape:
-                        escape = False
-                    elif ch == "\\":
-                        escape = True
-                    elif ch == '"':
-                        in_string = False
-                    continue
-
-                if ch == '"':
-                    in_string = True
-                elif ch == "{":
-                    depth += 1
-                elif ch == "}":
-                    depth -= 1
-                    if depth == 0:
-                        candidate = text[start:idx + 1].strip()
-                        try:
-                            parsed = json.loads(candidate)
-                            if isinstance(parsed, dict):
-                                return candidate
-                        except Exception:
-                            break
+        # raw_decode from each "{" — stops at the end of the object, so
+        # trailing prose after it does not matter
+        start = text.find("{")
+        while start != -1:
+            try:
+                parsed, end = _JSON_DECODER.raw_decode(text, start)
+                if isinstance(parsed, dict):
+                    return text[start:end]
+            except json.JSONDecodeError:
+                pass
+            start = text.find("{", start + 1)
         return None
 
     def emit(step, message):
@@ -350,9 +1035,13 @@ def generate_strategy_chips(
             conversation_history=conversation_history_str,
             case_context=case_context_dict
         )
-        print(f"🎮 Generating strategy chips...")
-        chips_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        chips_future = chips_executor.submit(
+        cache_key = hashlib.blake2b(chips_prompt.encode("utf-8"), digest_size=16).hexdigest()
+        cached = _CHIPS_CACHE.get(cache_key)
+        if cached is not None:
+            log.info("💾 Chips cache hit — skipped Gemini call")
+            return _copy_chips(cached)
+        log.info("🎮 Generating strategy chips...")
+        chips_future = _LLM_POOL.submit(
             call_gemini_with_retry,
             chips_prompt,
             2,
@@ -362,20 +1051,20 @@ def generate_strategy_chips(
         try:
             chips_response = chips_future.result(timeout=60)
         finally:
-            chips_executor.shutdown(wait=False, cancel_futures=True)
+            chips_future.cancel()
 
         try:
             chips_cleaned = _extract_json_payload(chips_response)
             if not chips_cleaned:
-                print(f"⚠️  Failed to find JSON object in chips response. Raw: {chips_response[:200] if chips_response else 'None'}")
+                log.warning("⚠️  Failed to find JSON object in chips response. Raw: %s", chips_response[:200] if chips_response else 'None')
                 return _default_chips(role, current_round)
 
-            chips = json.loads(chips_cleaned)
+            chips = _JSON_DECODER.decode(chips_cleaned)
             if not isinstance(chips, dict) or "question" not in chips or "options" not in chips:
-                print(f"⚠️  Chips missing required fields. Parsed: {chips}")
+                log.warning("⚠️  Chips missing required fields. Parsed: %s", chips)
                 return _default_chips(role, current_round)
             if not isinstance(chips["options"], list) or len(chips["options"]) == 0:
-                print(f"⚠️  Chips options invalid")
+                log.warning("⚠️  Chips options invalid")
                 return _default_chips(role, current_round)
 
             valid_options = []
@@ -387,24 +1076,47 @@ def generate_strategy_chips(
 
             if valid_options:
                 chips["options"] = valid_options
-                print(f"✅ Chips generated: {chips.get('question', '')}")
+                log.info("✅ Chips generated: %s", chips.get('question', ''))
+                _CHIPS_CACHE.set(cache_key, _copy_chips(chips))
                 return chips
             return _default_chips(role, current_round)
         except json.JSONDecodeError as jde:
-            print(f"⚠️  Failed to parse chips JSON: {jde}. Raw: {chips_response[:200] if chips_response else 'None'}")
+            log.warning("⚠️  Failed to parse chips JSON: %s. Raw: %s", jde, chips_response[:200] if chips_response else 'None')
             return _default_chips(role, current_round)
     except concurrent.futures.TimeoutError:
-        print(f"⚠️  Chips generation timed out, using contextual defaults")
+        log.warning("⚠️  Chips generation timed out, using contextual defaults")
         emit("chips_warn", "⚠ Strategy options timed out — using defaults")
         return _default_chips(role, current_round)
     except Exception as e:
-        print(f"⚠️  Chips generation failed: {e}")
+        log.warning("⚠️  Chips generation failed: %s", e)
         return _default_chips(role, current_round)
 
 
 # =============================================================================
 # Phase 2: Turn-Based Negotiation
 # =============================================================================
+def _mediator_cache_key(case_id: str, mediator_prompt: str) -> str:
+    """Per-case key over the rendered prompt (case facts + recent history)."""
+    return hashlib.sha256(f"{case_id}\x00{mediator_prompt}".encode("utf-8")).hexdigest()
+
+
+def mediator_case_data(case_data: dict, evidence_summary: str = "") -> dict:
+    """Map a raw case doc onto the case_data_dict shape the mediator prompt expects."""
+    claim_amount = case_data.get("amount", 0) or 0
+    floor_price = case_data.get("floorPrice", 0) or 0
+    return {
+        "case_title": case_data.get("title", "Dispute"),
+        "case_type": case_data.get("caseType", "tenancy_deposit"),
+        "case_description": case_data.get("description", ""),
+        "evidence_summary": evidence_summary,
+        "floor_price": floor_price,
+        "dispute_amount": claim_amount,
+        "defendant_max_offer": int(claim_amount * 0.5) if claim_amount > 0 else floor_price,
+        "defendant_description": case_data.get("defendantDescription", ""),
+        "legal_context": "",
+    }
+
+
 def inject_mediator_guidance(case_id: str, case_data_dict: dict, history: list) -> None:
     """
     After Round 2, inject LLM-powered mediator guidance message.
@@ -413,81 +1125,102 @@ def inject_mediator_guidance(case_id: str, case_data_dict: dict, history: list)
     db = get_db()
     case_ref = db.collection("cases").document(case_id)
     
+    is_fallback = False
     try:
-        print(f"⚖️  Injecting LLM mediator guidance (Round 2.5)")
+        log.info("⚖️  Injecting LLM mediator guidance (Round 2.5)")
         
         # Build conversation history string for mediator
-        conversation_summary = "\n".join([
-            f"[{msg['role'].upper()}]: {msg['content'][:200]}"
-            for msg in history[-6:]
-        ])
-        
+        conversation_summary = _render_history(history[-6:], cap=200)
+
         mediator_prompt = build_mediator_prompt(
             case_data=case_data_dict,
             conversation_history=conversation_summary
         )
+
+        cache_key = _mediator_cache_key(case_id, mediator_prompt)
+        formatted_guidance = _MEDIATOR_CACHE.get(cache_key)
+        recent_failure = _MEDIATOR_FAIL_CACHE.get(case_id)
+        if formatted_guidance is not None:
+            log.info("💾 Mediator cache hit — skipped ~50s Gemini call")
+        elif recent_failure is not None:
+            log.info("💾 Mediator failed recently for %s — reusing fallback", case_id)
+            formatted_guidance, is_fallback = recent_failure
+        else:
+            raw_mediator = call_gemini_with_retry(
+                mediator_prompt, per_call_timeout=50, response_schema=MEDIATOR_RESPONSE_SCHEMA
+            )
         
-        raw_mediator = call_gemini_with_retry(mediator_prompt, per_call_timeout=50)
-        
-        # Parse mediator JSON
-        try:
-            cleaned = raw_mediator.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            elif cleaned.startswith("```"):
-                cleaned = cleaned.split("```")[1].split("```")[0].strip()
-            
-            mediator_json = json.loads(cleaned)
-            guidance_text = mediator_json.get("summary", raw_mediator)
-            recommended_rm = mediator_json.get("recommended_settlement_rm")
-            confidence = mediator_json.get("confidence")
+            # Parse mediator JSON
+            try:
+                mediator_json = _parse_llm_json(raw_mediator)
+                guidance_text = mediator_json.get("summary", raw_mediator)
+                recommended_rm = mediator_json.get("recommended_settlement_rm")
+                confidence = mediator_json.get("confidence")
             
-            # Format nicely
-            formatted_guidance = f"⚖️ **Mediator Guidance**\n\n{guidance_text}"
-            if recommended_rm:
-                formatted_guidance += f"\n\n**Recommended Settlement:** RM {recommended_rm:,.0f}"
-            formatted_guidance += "\n\n_Note: This is AI-generated guidance, not legal advice._"
+                # Format nicely
+                formatted_guidance = f"⚖️ **Mediator Guidance**\n\n{guidance_text}"
+                if recommended_rm:
+                    formatted_guidance += f"\n\n**Recommended Settlement:** RM {recommended_rm:,.0f}"
+                formatted_guidance += "\n\n_Note: This is AI-generated guidance, not legal advice._"
+                # Only well-formed guidance is reused; raw-text fallbacks are not cached
+                _MEDIATOR_CACHE.set(cache_key, formatted_guidance)
             
-        except json.JSONDecodeError:
-            formatted_guidance = f"⚖️ **Mediator Guidance**\n\n{raw_mediator}\n\n_Note: This is AI-generated guidance, not legal advice._"
-        
-        mediator_audio_url = generate_and_upload_role_audio(
-            case_id=case_id,
-            round_num=2.5,
-            role="mediator",
-            text=formatted_guidance,
-        )
-
-        # Save to Firestore
-        case_ref.collection("messages").add({
-            "role": "mediator",
-            "content": formatted_guidance,
-            "round": 2.5,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-            "is_guidance": True,
-            "audio_url": mediator_audio_url,
-        })
-        
-        print(f"✅ Mediator guidance injected (LLM)")
+            except json.JSONDecodeError:
+                formatted_guidance = f"⚖️ **Mediator Guidance**\n\n{raw_mediator}\n\n_Note: This is AI-generated guidance, not legal advice._"
+                _MEDIATOR_FAIL_CACHE.set(case_id, (formatted_guidance, False))
         
     except Exception as e:
-        print(f"⚠️  Failed to inject mediator guidance: {e}")
-        # Save a fallback so mediator_already_injected=True on next call
-        fallback_text = (
+        log.warning("⚠️  Failed to generate mediator guidance: %s", e)
+        # Fallback guidance still sets mediatorInjected so the next call skips injection
+        formatted_guidance = (
             "⚖️ **Mediator Guidance**\n\n"
             "Both parties have presented their positions. "
             "The mediator encourages both sides to consider the other's perspective and move toward a reasonable settlement. "
             "Please review the evidence and make your next strategic decision.\n\n"
             "_Note: This is fallback guidance. The AI mediator was temporarily unavailable._"
         )
-        case_ref.collection("messages").add({
-            "role": "mediator",
-            "content": fallback_text,
-            "round": 2.5,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-            "is_guidance": True,
-            "audio_url": None,
-        })
+        is_fallback = True
+        _MEDIATOR_FAIL_CACHE.set(case_id, (formatted_guidance, True))
+
+    # Start TTS now so synthesis + upload overlap the Firestore write
+    audio_future = None
+    if not is_fallback:
+        audio_future = _TTS_POOL.submit(
+            generate_and_upload_role_audio, case_id, 2.5, "mediator", formatted_guidance
+        )
+
+    # Single transactional write — a retry or concurrent call can never add a second mediator message
+    message_ref = case_ref.collection("messages").document(
+        f"{time.time_ns():020d}-00-{uuid.uuid4().hex[:8]}"
+    )
+    payload = {
+        "role": "mediator",
+        "content": formatted_guidance,
+        "round": 2.5,
+        "createdAt": _SERVER_TS,
+        "is_guidance": True,
+        "audio_url": None,
+    }
+    if audio_future is not None and audio_future.done():
+        # TTS cache hit — write the URL with the message instead of patching it later
+        try:
+            payload["audio_url"] = audio_future.result()
+        except Exception as e:
+            log.warning("⚠️  Failed to attach mediator audio: %s", e)
+        audio_future = None
+    try:
+        written = _write_mediator_once(db.transaction(), case_ref, message_ref, payload)
+    except Exception as e:
+        log.warning("⚠️  Failed to save mediator guidance: %s", e)
+        return
+    if not written:
+        log.info("⚖️  Mediator guidance already present, skipping duplicate write")
+        return
+
+    log.info("✅ Mediator guidance injected (%s)", "fallback" if is_fallback else "LLM")
+    if audio_future is not None:
+        # Audio is attached once ready; the turn does not wait on TTS
+        _attach_mediator_audio(message_ref, audio_future)
 
 def run_negotiation_turn(
     case_id: str,
@@ -531,67 +1264,84 @@ def run_negotiation_turn(
         # =====================================================================
         emit("context", "Analyzing case context...")
         
-        case_data = case_ref.get().to_dict()
+        # Case doc, recent messages and evidence are independent — fetch concurrently
+        case_future = _TURN_POOL.submit(lambda: case_ref.get().to_dict())
+        history_future = _TURN_POOL.submit(_load_recent_history, messages_ref)
+        cached_evidence = _EVIDENCE_CACHE.get(case_id)
+        evidence_future = None
+        if cached_evidence is None:
+            evidence_future = _TURN_POOL.submit(_load_turn_evidence, case_ref)
+
+        case_data = case_future.result()
         case_title = case_data.get("title", "Dispute")
         case_type = case_data.get("caseType", "tenancy_deposit")
         
-        # Get conversation history
-        history = []
-        messages_docs = messages_ref.order_by("createdAt").stream()
-        for msg_doc in messages_docs:
-            msg_data = msg_doc.to_dict()
-            history.append({
-                "role": msg_data.get("role"),
-                "content": msg_data.get("content"),
-                "round": msg_data.get("round"),
+        # Round + mediator state are counters on the case doc; prompts only need
+        # the recent tail of the conversation, so never stream the full history.
+        plaintiff_count = case_data.get("plaintiffMessageCount")
+        mediator_already_injected = case_data.get("mediatorInjected")
+        if plaintiff_count is None or mediator_already_injected is None:
+            # Legacy case without counters — derive once with server-side
+            # aggregation (no message docs transferred), then persist
+            plaintiff_count, mediator_already_injected = _derive_legacy_counters(messages_ref)
+            case_ref.update({
+                "plaintiffMessageCount": plaintiff_count,
+                "mediatorInjected": mediator_already_injected,
             })
-        
+
+        history = history_future.result()
+
         # Derive round from plaintiff message count (authoritative)
-        plaintiff_count = sum(1 for m in history if m["role"] == "plaintiff")
         derived_round = plaintiff_count + 1  # 0 plaintiff msgs → round 1, etc.
         if derived_round > MAX_ROUNDS:
             derived_round = MAX_ROUNDS
+
+        # Start RAG now so it overlaps evidence/prompt prep and any mediator call;
+        # skipped for the mediator-only step, which returns before generating
+        mediator_only = (
+            derived_round == 3 and not mediator_already_injected
+            and not (user_message and user_message.strip())
+        )
+        rag_future = None
+        if not mediator_only:
+            emit("rag", "Searching legal database for relevant laws...")
+            rag_future = _TURN_POOL.submit(
+                _retrieve_turn_laws, case_type, case_title, user_message, history, emit
+            )
         
-        print(f"\n{'='*60}")
-        print(f"🎮 [Round {derived_round}] AI vs AI turn for case {case_id}")
-        print(f"   Commander directive: {user_message[:80] if user_message else '(none)'}")
-        print(f"   Evidence URIs: {len(evidence_uris) if evidence_uris else 0}")
-        print(f"{'='*60}")
+        log.info("\n%s", '='*60)
+        log.info("🎮 [Round %s] AI vs AI turn for case %s", derived_round, case_id)
+        log.info("   Commander directive: %s", user_message[:80] if user_message else '(none)')
+        log.info("   Evidence URIs: %s", len(evidence_uris) if evidence_uris else 0)
+        log.info("%s", '='*60)
         
         # Get evidence context + file parts for Gemini multipart
-        evidence_docs = case_ref.collection("evidence").stream()
-        evidence_texts = []
-        evidence_file_parts = []  # (file_uri, mime_type) tuples for Gemini
-        for edoc in evidence_docs:
-            evidence_data = edoc.to_dict()
-            extracted = evidence_data.get("extractedText")
-            if extracted:
-                evidence_texts.append(extracted)
-            # Collect Gemini File API URIs with their mime types
-            furi = evidence_data.get("file_uri")
-            fmime = evidence_data.get("fileType")
-            if furi and fmime:
-                evidence_file_parts.append((furi, fmime))
+        evidence_texts, evidence_file_parts = _turn_evidence(
+            case_id, case_ref, case_data, cached_evidence, evidence_future
+        )
 
         # Keep prompt size bounded to reduce model timeouts/failures
-        clipped_evidence = [_clip_text(text, 700) for text in evidence_texts[:8] if text]
-        evidence_context = "\n".join(clipped_evidence) if clipped_evidence else "No evidence provided."
+        evidence_context = _render_evidence_context(evidence_texts)
 
         # Cap file parts at 5 to avoid oversized requests
         evidence_file_parts = evidence_file_parts[:5] if evidence_file_parts else None
-        print(f"   Evidence file parts: {len(evidence_file_parts) if evidence_file_parts else 0}")
+        evidence_cache = _evidence_context_cache(
+            case_id, case_data.get("evidenceVersion", 0), evidence_file_parts
+        )
+        log.info("   Evidence file parts: %s", len(evidence_file_parts) if evidence_file_parts else 0)
 
         # =====================================================================
-        # Step 2: Save user directive (if provided)
+        # Step 2: Queue user directive (if provided) — committed with the turn batch
         # =====================================================================
+        directive_payload = None
         if user_message and user_message.strip():
-            print(f"📝 Saving commander directive...")
-            messages_ref.add({
+            log.info("📝 Queuing commander directive...")
+            directive_payload = {
                 "role": "directive",
                 "content": user_message.strip(),
                 "round": derived_round,
-                "createdAt": firestore.SERVER_TIMESTAMP,
-            })
+                "createdAt": _SERVER_TS,
+            }
 
         # =====================================================================
         # Step 3: Inject mediator guidance at Round 3
@@ -615,10 +1365,13 @@ def run_negotiation_turn(
             "defendant_description": defendant_description,
             "legal_context": "",  # Will be filled after RAG
         }
-        
-        mediator_already_injected = any(m.get("role") == "mediator" for m in history)
+
         if derived_round == 3 and not mediator_already_injected:
             emit("mediator", "⚖️ Mediator is reviewing the case...")
+            # Directive must land before the mediator message, so flush it now
+            if directive_payload:
+                messages_ref.add(directive_payload)
+                directive_payload = None
             inject_mediator_guidance(case_id, case_data_dict, history)
 
             # Round 2 -> mediator intervention step (no user chips/input in between)
@@ -634,7 +1387,7 @@ def run_negotiation_turn(
                 if not chips:
                     chips = _default_chips("plaintiff", 3)
                 emit("complete", "Mediator intervention complete.")
-                print("✅ Mediator-only intervention complete. Awaiting user strategy for Round 3.")
+                log.info("✅ Mediator-only intervention complete. Awaiting user strategy for Round 3.")
                 # Persist displayRound so frontend survives refresh
                 case_ref.update({"displayRound": 3})
                 return {
@@ -654,73 +1407,38 @@ def run_negotiation_turn(
         # =====================================================================
         # Step 4: RAG - Search for relevant laws
         # =====================================================================
-        emit("rag", "Searching legal database for relevant laws...")
-        # Build RAG query — history is already passed to agentic LLM which extracts citations itself
-        rag_parts = [case_type, case_title]
-        if user_message:
-            rag_parts.append(user_message)
-        rag_query = " ".join(rag_parts)
-        legal_docs = []
-        try:
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            future = executor.submit(
-                retrieve_law,
-                query=rag_query,
-                history=history,
-                use_agentic=True,
-            )
-            try:
-                legal_docs = future.result(timeout=45)  # 45s hard limit
-            finally:
-                executor.shutdown(wait=False, cancel_futures=True)
-        except concurrent.futures.TimeoutError:
-            print(f"\u23f0 RAG search timed out after 45s, proceeding without legal context")
-            emit("rag_warn", "\u26a0 Legal search timed out — proceeding without case law")
-            legal_docs = []
-        except Exception as e:
-            print(f"\u26a0\ufe0f  RAG search error: {e}, proceeding without legal context")
-            emit("rag_warn", f"\u26a0 Legal search failed: {str(e)[:80]} — proceeding anyway")
-            legal_docs = []
+        # History is passed to the agentic LLM which extracts citations itself
+        legal_docs = rag_future.result()
         
         if legal_docs:
-            legal_context = "\n".join([
-                f"- {doc['law']} Section {doc['section']}: {doc['excerpt'][:300]}..."
-                for doc in legal_docs
-            ])
-            print(f"📚 Retrieved {len(legal_docs)} legal references")
+            legal_context = _format_turn_legal_context(legal_docs)
+            log.info("📚 Retrieved %s legal references", len(legal_docs))
         else:
             legal_context = "No specific laws retrieved. Rely on general contract principles."
-            print(f"⚠️  No laws retrieved from RAG")
+            log.warning("⚠️  No laws retrieved from RAG")
         
         case_data_dict["legal_context"] = legal_context
 
         if time.monotonic() - turn_started_at > TURN_TOTAL_TIMEOUT_SEC:
             raise TimeoutError(f"Turn exceeded {TURN_TOTAL_TIMEOUT_SEC}s during legal retrieval")
         
-        # Format conversation history for prompts (exclude directives from shared history)
-        conversation_history = "\n".join([
-            f"[{msg['role'].upper()}]: {msg['content']}"
-            for msg in history[-6:]
-            if msg['role'] != 'directive'
-        ])
+        # Format case facts + shared history once for both role prompts
+        prompt_ctx = PromptContext.build(case_data_dict, history)
         
         # =====================================================================
         # Step 5: Generate PLAINTIFF AI response (with auditor retry)
         # =====================================================================
         emit("plaintiff", "Your agent is building legal arguments...")
-        print(f"🤖 [Round {derived_round}] Generating plaintiff response...")
+        log.info("🤖 [Round %s] Generating plaintiff response...", derived_round)
         
-        plaintiff_prompt = build_plaintiff_prompt(
-            case_data=case_data_dict,
-            current_round=derived_round
-        )
+        plaintiff_prompt = prompt_ctx.role_prompt("plaintiff", derived_round)
     
         directive_section = _build_directive_section(user_message, role="plaintiff")
 
         full_plaintiff_prompt = f"""{plaintiff_prompt}
 
 === CONVERSATION HISTORY ===
-{conversation_history}
+{prompt_ctx.history_snippet}
 {directive_section}
 
 === CURRENT SITUATION ===
@@ -736,60 +1454,58 @@ Now argue as the Plaintiff. Remember to output ONLY valid JSON."""
         plaintiff_audit_result = {"is_valid": True, "citations_found": []}
         
         try:
-            plaintiff_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            plaintiff_future = plaintiff_executor.submit(
-                call_gemini_with_retry,
+            plaintiff_audio = _EarlyRoleAudio(
+                case_id, derived_round, "plaintiff", _token_forwarder(progress_callback, "plaintiff_token")
+            )
+            plaintiff_future = _LLM_POOL.submit(
+                _generate_negotiation_reply,
                 full_plaintiff_prompt,
-                2,
-                30,
                 progress_callback,
                 evidence_file_parts,
+                plaintiff_audio,
+                evidence_cache,
             )
             try:
                 raw_plaintiff = plaintiff_future.result(timeout=90)
             finally:
-                plaintiff_executor.shutdown(wait=False, cancel_futures=True)
+                plaintiff_future.cancel()
             
             # Parse plaintiff JSON
             try:
-                cleaned = _extract_json_from_text(raw_plaintiff)
-                plaintiff_json = json.loads(cleaned)
-                plaintiff_text = plaintiff_json.get("message", cleaned)
+                plaintiff_json = _parse_llm_json(raw_plaintiff)
+                plaintiff_text = plaintiff_json.get("message", raw_plaintiff)
                 plaintiff_offer = plaintiff_json.get("counter_offer_rm")
-                print(f"✅ Plaintiff JSON parsed. Offer: {plaintiff_offer}")
+                log.info("✅ Plaintiff JSON parsed. Offer: %s", plaintiff_offer)
             except json.JSONDecodeError:
-                print(f"⚠️  Plaintiff JSON parse failed, using raw text")
+                log.warning("⚠️  Plaintiff JSON parse failed, using raw text")
                 plaintiff_text = raw_plaintiff
                 plaintiff_offer = None
         except concurrent.futures.TimeoutError:
-            print("⚠️  Plaintiff generation hard-timeout reached, using fallback response")
+            log.warning("⚠️  Plaintiff generation hard-timeout reached, using fallback response")
             plaintiff_text = "I need a moment to review the evidence and legal points. I maintain my current position for now."
             plaintiff_offer = None
         except Exception as e:
-            print(f"❌ Plaintiff generation failed: {e}")
+            log.error("❌ Plaintiff generation failed: %s", e)
             plaintiff_text = "I need a moment to review the case details. I maintain my current position for now."
             plaintiff_offer = None
                 
-        # Save plaintiff immediately — TTS and audit run in parallel with defendant generation
-        print(f"💾 Saving plaintiff message...")
-        plaintiff_msg_ref = messages_ref.add({
+        # Hold plaintiff payload until TTS and audit finish — both run in parallel with defendant generation
+        plaintiff_payload = {
             "role": "plaintiff",
             "content": plaintiff_text,
             "round": derived_round,
             "counter_offer_rm": plaintiff_offer,
-            "audio_url": None,  # Updated async below
-            "auditor_passed": None,
-            "auditor_warning": None,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-        })[1]
+            "createdAt": _SERVER_TS,
+        }
 
         # Launch plaintiff TTS and auditor in background — parallel with defendant LLM
-        p_tts_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        p_tts_future = p_tts_pool.submit(
-            generate_and_upload_role_audio, case_id, derived_round, "plaintiff", plaintiff_text
-        )
-        p_audit_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        p_audit_future = p_audit_pool.submit(validate_turn, plaintiff_text)
+        p_tts_future = plaintiff_audio.audio_future(plaintiff_text)
+        if may_contain_citations(plaintiff_text):
+            p_audit_future = _TURN_POOL.submit(validate_turn, plaintiff_text)
+        else:
+            # Nothing citation-like to audit — skip the background task
+            p_audit_future = concurrent.futures.Future()
+            p_audit_future.set_result({"is_valid": True, "flagged_law": None, "citations_found": []})
 
         # Add to history immediately so defendant prompt includes plaintiff's message
         history.append({
@@ -805,24 +1521,17 @@ Now argue as the Plaintiff. Remember to output ONLY valid JSON."""
             raise TimeoutError(f"Turn exceeded {TURN_TOTAL_TIMEOUT_SEC}s before defendant response")
 
         emit("defendant", "Opponent is preparing counter-arguments...")
-        print(f"🤖 [Round {derived_round}] Generating defendant response...")
+        log.info("🤖 [Round %s] Generating defendant response...", derived_round)
         
-        defendant_prompt = build_defendant_prompt(
-            case_data=case_data_dict,
-            current_round=derived_round
-        )
+        defendant_prompt = prompt_ctx.role_prompt("defendant", derived_round)
         
-        # Rebuild conversation history including plaintiff's new message (exclude directives from defendant view)
-        conversation_history_updated = "\n".join([
-            f"[{msg['role'].upper()}]: {msg['content']}"
-            for msg in history[-6:]
-            if msg['role'] != 'directive'
-        ])
+        # Append plaintiff's new message to the shared snippet; case facts are reused as-is
+        defendant_ctx = prompt_ctx.with_message(history[-1])
         
         full_defendant_prompt = f"""{defendant_prompt}
 
 === CONVERSATION HISTORY ===
-{conversation_history_updated}
+{defendant_ctx.history_snippet}
 
 === CURRENT SITUATION ===
 Round {derived_round} of {MAX_ROUNDS}
@@ -838,37 +1547,38 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         audit_result = {"is_valid": True, "citations_found": []}
         
         try:
-            defender_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            defender_future = defender_executor.submit(
-                call_gemini_with_retry,
+            defendant_audio = _EarlyRoleAudio(
+                case_id, derived_round, "defendant", _token_forwarder(progress_callback, "defendant_token")
+            )
+            defender_future = _LLM_POOL.submit(
+                _generate_negotiation_reply,
                 full_defendant_prompt,
-                2,
-                30,
                 progress_callback,
                 evidence_file_parts,
+                defendant_audio,
+                evidence_cache,
             )
             try:
                 raw_response = defender_future.result(timeout=90)
             finally:
-                defender_executor.shutdown(wait=False, cancel_futures=True)
+                defender_future.cancel()
             
             # Parse JSON
             try:
-                cleaned = _extract_json_from_text(raw_response)
-                response_json = json.loads(cleaned)
-                agent_text = response_json.get("message", cleaned)
+                response_json = _parse_llm_json(raw_response)
+                agent_text = response_json.get("message", raw_response)
                 game_eval = evaluate_game_state(response_json, floor_price or 0, current_round=derived_round, max_rounds=MAX_ROUNDS)
                 counter_offer = game_eval["offer_amount"]
 
-                print(f"✅ Defendant JSON parsed. Offer: {counter_offer}, meets_floor: {game_eval['meets_floor']}")
+                log.info("✅ Defendant JSON parsed. Offer: %s, meets_floor: %s", counter_offer, game_eval['meets_floor'])
             except json.JSONDecodeError:
-                print(f"⚠️  Defendant JSON parse failed, using raw text")
+                log.warning("⚠️  Defendant JSON parse failed, using raw text")
                 agent_text = raw_response
                 counter_offer = None
                 game_eval = {"has_offer": False, "offer_amount": None, "meets_floor": False}
         except concurrent.futures.TimeoutError:
             emit("defendant_warn", "⚠ Opponent response timed out — proceeding with fallback")
-            print("⚠️  Defendant generation hard-timeout reached, using fallback response")
+            log.warning("⚠️  Defendant generation hard-timeout reached, using fallback response")
             raw_response = json.dumps({
                 "message": "I need a moment to review your points. I maintain my current position for now.",
                 "counter_offer_rm": None,
@@ -884,7 +1594,7 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
                 game_eval = {"has_offer": False, "offer_amount": None, "meets_floor": False}
         except Exception as e:
             emit("defendant_error", f"❌ Defendant agent failed: {str(e)[:100]}")
-            print(f"❌ Defendant generation failed: {e}")
+            log.error("❌ Defendant generation failed: %s", e)
             agent_text = "I need a moment to review your latest points. I maintain my current position for now."
             counter_offer = None
             game_eval = {"has_offer": False, "offer_amount": None, "meets_floor": False}
@@ -897,45 +1607,36 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
             plaintiff_audio_url = p_tts_future.result(timeout=25)
         except Exception:
             plaintiff_audio_url = None
-        finally:
-            p_tts_pool.shutdown(wait=False)
 
         try:
             plaintiff_audit_result = p_audit_future.result(timeout=10)
             plaintiff_auditor_passed = plaintiff_audit_result["is_valid"]
             if not plaintiff_auditor_passed:
                 plaintiff_auditor_warning = plaintiff_audit_result.get("auditor_warning", "Citation validation failed")
-                print(f"❌ [Plaintiff Auditor] Failed: {plaintiff_auditor_warning}")
+                log.error("❌ [Plaintiff Auditor] Failed: %s", plaintiff_auditor_warning)
                 emit("auditor_warn", f"⚠ Plaintiff Audit failed: {plaintiff_auditor_warning[:80]}")
             else:
-                print(f"✅ [Plaintiff Auditor] Validation passed")
+                log.info("✅ [Plaintiff Auditor] Validation passed")
                 plaintiff_auditor_warning = None
         except Exception:
             plaintiff_auditor_passed = True
             plaintiff_auditor_warning = None
-        finally:
-            p_audit_pool.shutdown(wait=False)
 
         _log_analytics("auditor_metrics", "auto_audit_passes" if plaintiff_auditor_passed else "auto_audit_failures")
 
-        plaintiff_msg_ref.update({
+        plaintiff_payload.update({
             "audio_url": plaintiff_audio_url,
             "auditor_passed": plaintiff_auditor_passed,
             "auditor_warning": plaintiff_auditor_warning,
         })
 
-        # Save defendant immediately, run TTS and auditor in parallel with each other
-        print(f"💾 Saving defendant message...")
-        defendant_msg_ref = messages_ref.add({
+        defendant_payload = {
             "role": "defendant",
             "content": agent_text,
             "round": derived_round,
             "counter_offer_rm": counter_offer,
-            "audio_url": None,  # Updated async below
-            "auditor_passed": None,
-            "auditor_warning": None,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-        })[1]
+            "createdAt": _SERVER_TS,
+        }
 
         # Add defendant response to history so chips reflect the latest exchange
         history.append({
@@ -944,68 +1645,95 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
             "round": derived_round,
         })
 
+        # =====================================================================
+        # Step 7b: Determine game state (depends only on the defendant's offer)
+        # =====================================================================
+        game_state = "active"
+        case_updates: Dict[str, Any] = {}
+
+        if game_eval.get("meets_floor"):
+            game_state = "pending_accept"
+            case_updates.update({"game_state": "pending_accept", "pendingDecisionRole": "plaintiff"})
+            log.info("⏳ Plaintiff decision required! Offer (%s) meets floor (%s)", counter_offer, floor_price)
+
+        # After the final round, ALWAYS force the final accept/reject screen.
+        # This overrides pending_accept too — at round 4 there is no
+        # "Continue Negotiation" option, only Accept or Reject & Go to Court.
+        if derived_round >= MAX_ROUNDS:
+            if game_state != "settled":
+                game_state = "pending_decision"
+                log.info("⏰ Round %s is the last round. Forcing final accept/reject decision screen.", derived_round)
+
+        # display_round = the round the user is ABOUT TO play next
+        display_round = min(derived_round + 1, MAX_ROUNDS) if game_state == "active" else derived_round
+        # If mediator will fire next (round 2 → 3 transition), keep display at
+        # current round so the badge stays on "Round 2" until the mediator
+        # auto-trigger shows "Mediator Intervention", then advances to 3.
+        if game_state == "active" and derived_round == 2 and not mediator_already_injected:
+            display_round = derived_round  # Stay at 2; mediator early-return advances to 3
+        # Persist so frontend survives page refresh
+        case_updates["displayRound"] = display_round
+        case_updates["plaintiffMessageCount"] = firestore.Increment(1)
+
+        # Chips only need the updated history, so generate them while the
+        # defendant's TTS and audit run instead of after the batch commit
+        chips_future = None
+        if game_state == "active":
+            chips_future = _TURN_POOL.submit(
+                generate_strategy_chips,
+                case_title=case_title,
+                current_round=derived_round,
+                counter_offer=counter_offer,
+                history=list(history),
+                progress_callback=progress_callback,
+            )
+
         # Run defendant TTS in background while auditor runs in main thread
-        d_tts_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        d_tts_future = d_tts_pool.submit(
-            generate_and_upload_role_audio, case_id, derived_round, "defendant", agent_text
-        )
+        d_tts_future = defendant_audio.audio_future(agent_text)
         emit("auditor", "Validating legal citations...")
-        print(f"🛡️  [Auditor] Validating...")
+        log.info("🛡️  [Auditor] Validating...")
         audit_result = validate_turn(agent_text)
 
         try:
             audio_url = d_tts_future.result(timeout=25)
         except Exception:
             audio_url = None
-        finally:
-            d_tts_pool.shutdown(wait=False)
 
         auditor_passed = audit_result["is_valid"]
         _log_analytics("auditor_metrics", "auto_audit_passes" if auditor_passed else "auto_audit_failures")
         if not auditor_passed:
             auditor_warning = audit_result.get("auditor_warning", "Citation validation failed")
-            print(f"❌ [Auditor] Failed: {auditor_warning}")
+            log.error("❌ [Auditor] Failed: %s", auditor_warning)
             emit("auditor_warn", f"⚠ Audit failed: {auditor_warning[:80]}")
         else:
-            print(f"✅ [Auditor] Validation passed")
+            log.info("✅ [Auditor] Validation passed")
 
-        # Update Firestore with audit results and audio_url
-        defendant_msg_ref.update({
+        defendant_payload.update({
             "audio_url": audio_url,
             "auditor_passed": auditor_passed,
             "auditor_warning": auditor_warning if not auditor_passed else None,
         })
 
         # =====================================================================
-        # Step 8: Determine game state
+        # Step 8: Commit the whole turn in one batch
         # =====================================================================
-        game_state = "active"
-
-        if game_eval.get("meets_floor"):
-            game_state = "pending_accept"
-            case_ref.update({"game_state": "pending_accept", "pendingDecisionRole": "plaintiff"})
-            print(f"⏳ Plaintiff decision required! Offer ({counter_offer}) meets floor ({floor_price})")
-
-        # After the final round, ALWAYS force the final accept/reject screen.
-        # This overrides pending_accept too — at round 4 there is no
-        # "Continue Negotiation" option, only Accept or Reject & Go to Court.
-        if derived_round >= MAX_ROUNDS:
-            if game_state != "settled":
-                game_state = "pending_decision"
-                print(f"⏰ Round {derived_round} is the last round. Forcing final accept/reject decision screen.")
+        log.info("💾 Saving turn messages (batched)...")
+        _commit_turn_batch(
+            db,
+            case_ref,
+            [p for p in (directive_payload, plaintiff_payload, defendant_payload) if p],
+            case_updates,
+        )
 
         # =====================================================================
-        # Step 9: Generate chips (sequential — avoids Gemini rate limits)
+        # Step 9: Collect chips
         # =====================================================================
         chips = None
-        if game_state == "active":
-            chips = generate_strategy_chips(
-                case_title=case_title,
-                current_round=derived_round,
-                counter_offer=counter_offer,
-                history=history,
-                progress_callback=progress_callback,
-            )
+        if chips_future is not None:
+            try:
+                chips = chips_future.result()
+            except Exception as e:
+                log.warning("⚠️ Chip generation failed: %s", e)
             if not chips:
                 chips = _default_chips("plaintiff", derived_round)
 
@@ -1015,19 +1743,9 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         # =====================================================================
         # Step 10: Return response
         # =====================================================================
-        # display_round = the round the user is ABOUT TO play next
-        display_round = min(derived_round + 1, MAX_ROUNDS) if game_state == "active" else derived_round
-        # If mediator will fire next (round 2 → 3 transition), keep display at
-        # current round so the badge stays on "Round 2" until the mediator
-        # auto-trigger shows "Mediator Intervention", then advances to 3.
-        if game_state == "active" and derived_round == 2 and not mediator_already_injected:
-            display_round = derived_round  # Stay at 2; mediator early-return advances to 3
-        # Persist so frontend survives page refresh
-        case_ref.update({"displayRound": display_round})
-
         emit("complete", "Turn complete!")
-        print(f"✅ [Round {derived_round}] Complete - Game state: {game_state}, displayRound: {display_round}")
-        print(f"{'='*60}\n")
+        log.info("✅ [Round %s] Complete - Game state: %s, displayRound: %s", derived_round, game_state, display_round)
+        log.info("%s\n", '='*60)
         
         return {
             "agent_message": agent_text,
@@ -1046,7 +1764,7 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         
     except Exception as e:
         error_msg = str(e)
-        print(f"\u274c [Orchestrator] Turn error: {error_msg}")
+        log.error("❌ [Orchestrator] Turn error: %s", error_msg)
         import traceback
         traceback.print_exc()
         
@@ -1067,11 +1785,31 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         }
 
 
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Role audio is a pure function of (voice, text): identical lines share one
+# content-addressed object under tts-cache/, and URLs are memoized in-process
+TTS_CACHE_PREFIX = "tts-cache"
+_TTS_URL_CACHE = TTLCache(maxsize=512, ttl=86400)
+# Google TTS rejects inputs over 5000 bytes; this also bounds the per-call TTS cost
+MAX_TTS_CHARS = 4500
+
+# Storage bucket handle — initialized once on first use (Firebase app must exist first)
+_storage_bucket = None
+
+
+def _get_storage_bucket():
+    global _storage_bucket
+    if _storage_bucket is None:
+        _storage_bucket = storage.bucket()
+    return _storage_bucket
+
+
 def upload_audio_to_storage(
     case_id: str,
     round_num: int,
     role: str,
-    audio_bytes: bytes
+    audio_bytes: bytes,
+    blob_path: Optional[str] = None,
 ) -> Optional[str]:
     """
     Upload audio bytes to Firebase Storage.
@@ -1081,35 +1819,46 @@ def upload_audio_to_storage(
         round_num: Round number
         role: Speaker role (plaintiff/defendant/mediator)
         audio_bytes: Audio file bytes
+        blob_path: Optional explicit object path (defaults to a per-case path)
         
     Returns:
         Public URL of uploaded audio, or None if failed
     """
     try:
-        bucket = storage.bucket()
-        blob_path = f"audio/{case_id}/round_{round_num}_{role}.mp3"
+        bucket = _get_storage_bucket()
+        if blob_path is None:
+            # Content hash in the name makes every object immutable, so it can be cached forever
+            digest = hashlib.sha256(audio_bytes).hexdigest()[:12]
+            blob_path = f"audio/{case_id}/round_{round_num}_{role}_{digest}.mp3"
         blob = bucket.blob(blob_path)
+        blob.cache_control = AUDIO_CACHE_CONTROL
         
-        print(f"📤 Uploading audio to: {blob_path}")
+        log.info("📤 Uploading audio to: %s", blob_path)
         
+        # Public-read ACL applied in the upload request itself (no separate make_public call)
         blob.upload_from_string(
             audio_bytes,
-            content_type="audio/mpeg"
+            content_type="audio/mpeg",
+            predefined_acl="publicRead",
         )
         
-        # Make public
-        blob.make_public()
-        
         public_url = blob.public_url
-        print(f"✅ Audio uploaded: {public_url}")
+        log.info("✅ Audio uploaded: %s", public_url)
         
         return public_url
         
     except Exception as e:
-        print(f"❌ Audio upload failed: {e}")
+        log.error("❌ Audio upload failed: %s", e)
         return None
 
 
+def _tts_cache_key(role: str, text: str) -> str:
+    voice_name = get_voice_for_role(role)
+    return hashlib.blake2b(
+        f"{voice_name}|{role}|{text.strip()}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
 def generate_and_upload_role_audio(
     case_id: str,
     round_num: int,
@@ -1118,31 +1867,66 @@ def generate_and_upload_role_audio(
 ) -> Optional[str]:
     if role not in {"plaintiff", "defendant", "mediator"}:
         return None
-    if not text or not text.strip():
+    if not text or text.isspace():
         return None
+    if len(text) > MAX_TTS_CHARS:
+        text = text[:MAX_TTS_CHARS]
+
+    cache_key = _tts_cache_key(role, text)
+    cached_url = _TTS_URL_CACHE.get(cache_key)
+    if cached_url:
+        return cached_url
 
     try:
-        audio_bytes = synthesize_audio_bytes(text=text, role=role)
-        if not audio_bytes:
-            return None
-        return upload_audio_to_storage(
-            case_id=case_id,
-            round_num=round_num,
-            role=role,
-            audio_bytes=audio_bytes,
-        )
+        blob_path = f"{TTS_CACHE_PREFIX}/{cache_key}.mp3"
+        cached_blob = _get_storage_bucket().blob(blob_path)
+        if cached_blob.exists():
+            # Same voice + text synthesized before (any case/worker) — reuse it
+            log.info("💾 TTS cache hit for %s", role)
+            audio_url = cached_blob.public_url
+        else:
+            audio_bytes = synthesize_audio_bytes(text=text, role=role)
+            if not audio_bytes:
+                return None
+            audio_url = upload_audio_to_storage(
+                case_id=case_id,
+                round_num=round_num,
+                role=role,
+                audio_bytes=audio_bytes,
+                blob_path=blob_path,
+            )
+        if audio_url:
+            _TTS_URL_CACHE.set(cache_key, audio_url)
+        return audio_url
     except Exception as e:
-        print(f"⚠️  TTS generation failed for {role}: {e}")
+        log.warning("⚠️  TTS generation failed for %s: %s", role, e)
         return None
 
 
-def generate_mediator_settlement(case_id: str) -> Dict[str, Any]:
+def _settlement_legal_context(case_title: str) -> str:
+    """Formatted legal context for a settlement — depends only on the case title."""
+    key = case_title.strip().lower()
+    cached = _SETTLEMENT_LAW_CACHE.get(key)
+    if cached is not None:
+        return cached
+    legal_docs = retrieve_law(case_title, use_agentic=False)
+    legal_context = "\n".join([
+        f"- {doc['law']} Section {doc['section']}: {doc['excerpt'][:200]}"
+        for doc in legal_docs
+    ])
+    if legal_docs:
+        _SETTLEMENT_LAW_CACHE.set(key, legal_context)
+    return legal_context
+
+
+def generate_mediator_settlement(case_id: str, case_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Phase 2: Generate final settlement using mediator prompt.
     Called when negotiation reaches deadlock or Round 4 ends.
     
     Args:
         case_id: The case ID
+        case_data: Case document the caller already loaded (fetched here if omitted)
         
     Returns:
         Settlement dict matching Settlement model from api_models.py
@@ -1151,44 +1935,37 @@ def generate_mediator_settlement(case_id: str) -> Dict[str, Any]:
     case_ref = db.collection("cases").document(case_id)
     
     try:
-        print(f"\n{'='*60}")
-        print(f"⚖️  Generating mediator settlement for case {case_id}")
-        print(f"{'='*60}")
+        log.info("⚖️  Generating mediator settlement for case %s", case_id)
         
-        # Retrieve case data
-        case_data = case_ref.get().to_dict()
+        # Case doc and full conversation are independent — fetch concurrently
+        messages_ref = case_ref.collection("messages")
+        case_future = None
+        if case_data is None:
+            case_future = _TURN_POOL.submit(lambda: case_ref.get().to_dict())
+        messages_future = _TURN_POOL.submit(_render_transcript, messages_ref)
+
+        if case_future is not None:
+            case_data = case_future.result()
         case_title = case_data.get("title")
         
         # Get full conversation history
-        messages_ref = case_ref.collection("messages")
-        messages = messages_ref.order_by("createdAt").stream()
-        
-        conversation_history = []
-        for msg_doc in messages:
-            msg_data = msg_doc.to_dict()
-            role = msg_data.get('role') or 'unknown'
-            content = msg_data.get('content') or ''
-            conversation_history.append(
-                f"[Round {msg_data.get('round')}] {role.upper()}: {content}"
-            )
-
-        history_text = "\n".join(conversation_history)
+        history_text = messages_future.result()
 
         # Get legal context
-        legal_docs = retrieve_law(case_title or "dispute", use_agentic=False)
-        legal_context = "\n".join([
-            f"- {doc['law']} Section {doc['section']}: {doc['excerpt'][:200]}"
-            for doc in legal_docs
-        ])
-
-        # Get evidence summary
-        evidence_docs = case_ref.collection("evidence").stream()
-        evidence_texts = []
-        for edoc in evidence_docs:
-            edata = edoc.to_dict()
-            extracted = edata.get("extractedText")
-            if extracted:
-                evidence_texts.append(_clip_text(extracted, 500))
+        legal_context = _settlement_legal_context(case_title or "dispute")
+
+        # Get evidence summary — aggregated on the case doc at upload time;
+        # only cases created before that field existed query the subcollection
+        evidence_texts = case_data.get("evidenceSummary")
+        if evidence_texts is not None:
+            # Entries are {id, text}; plain strings come from the first release of the aggregate
+            evidence_texts = [e.get("text", "") if isinstance(e, dict) else e for e in evidence_texts[:6]]
+        else:
+            # Only the first 6 are used — short texts skip the clip call entirely
+            evidence_texts = [
+                text if len(text) <= 500 else _clip_text(text, 500)
+                for text in itertools.islice(_load_turn_evidence(case_ref)[0], 6)
+            ]
         evidence_summary = "\n".join(evidence_texts[:6]) if evidence_texts else "No evidence provided."
 
         # Build mediator prompt with full case data
@@ -1207,42 +1984,40 @@ def generate_mediator_settlement(case_id: str) -> Dict[str, Any]:
         )
         
         # Generate settlement
-        print(f"🤖 Calling Gemini for mediator settlement...")
-        raw_response = call_gemini_with_retry(mediator_prompt)
+        log.info("🤖 Calling Gemini for mediator settlement...")
+        raw_response = call_gemini_with_retry(mediator_prompt, response_schema=SETTLEMENT_RESPONSE_SCHEMA)
         
-        # Parse JSON
+        # Parse JSON — JSON mode returns a bare object, so decode directly
         try:
-            cleaned = raw_response.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            elif cleaned.startswith("```"):
-                cleaned = cleaned.split("```")[1].split("```")[0].strip()
-            
-            settlement_json = json.loads(cleaned)
-            print(f"✅ Settlement generated successfully")
-            
-            # Save to Firestore
-            case_ref.update({
-                "status": "done",
-                "settlement": settlement_json
-            })
-            
-            return settlement_json
-            
+            try:
+                settlement_json = _JSON_DECODER.decode(raw_response)
+            except json.JSONDecodeError:
+                settlement_json = _parse_llm_json(raw_response)
+            # A bare list/string/number is as unusable as malformed JSON — take the fallback
+            if not isinstance(settlement_json, dict):
+                raise json.JSONDecodeError("Settlement is not a JSON object", raw_response, 0)
+            settlement_json.setdefault("citations", [])
+            log.info("✅ Settlement generated successfully")
         except json.JSONDecodeError:
-            print(f"❌ Failed to parse mediator JSON, raw: {raw_response[:300]}")
-            # Return fallback settlement
-            fallback = {
+            log.error("❌ Failed to parse mediator JSON, raw: %s", raw_response[:300])
+            # Fallback settlement
+            settlement_json = {
                 "summary": raw_response[:500] if raw_response else "Unable to generate settlement. Please consult a legal professional.",
                 "recommended_settlement_rm": 0,
                 "confidence": 0.0,
                 "citations": []
             }
-            case_ref.update({"status": "done", "settlement": fallback})
-            return fallback
+
+        # Single write for both outcomes
+        case_ref.set({
+            "status": "done",
+            "settlement": settlement_json,
+            "settlementGeneratedAt": _SERVER_TS,
+        }, merge=True)
+        return settlement_json
     
     except Exception as e:
-        print(f"❌ Mediator settlement error: {str(e)}")
+        log.error("❌ Mediator settlement error: %s", str(e))
         raise e
 
 # =============================================================================
@@ -1267,12 +2042,16 @@ def _pvp_background_work(
     then does the final Firestore update to turnStatus='waiting'.
     """
     chips = None
+    mediator_future = None
     try:
         # Only inject mediator if the game is still active — if it's pending_accept the
         # decision panel is showing and we must not alter state until the user resumes.
+        # Mediator guidance and chips are independent — run them side by side
         if is_mediator_round and game_state == "active":
             mediator_history = history + [{"role": user_role, "content": agent_text, "round": pvp_round}]
-            inject_mediator_guidance(case_id, case_data_dict, mediator_history)
+            mediator_future = _TURN_POOL.submit(
+                inject_mediator_guidance, case_id, case_data_dict, mediator_history
+            )
 
         if game_state == "active":
             try:
@@ -1285,17 +2064,23 @@ def _pvp_background_work(
                     role=next_turn,
                 )
             except Exception as e:
-                print(f"⚠️ [PvP BG] Chip generation failed: {e}")
+                log.warning("⚠️ [PvP BG] Chip generation failed: %s", e)
             if not chips:
                 chips = _default_chips(next_turn, next_round if next_round <= MAX_ROUNDS else MAX_ROUNDS)
     except Exception as e:
-        print(f"⚠️ [PvP BG] Background work error: {e}")
+        log.warning("⚠️ [PvP BG] Background work error: %s", e)
         if game_state == "active" and not chips:
             try:
                 chips = _default_chips(next_turn, next_round if next_round <= MAX_ROUNDS else MAX_ROUNDS)
             except Exception:
                 chips = None
     finally:
+        if mediator_future is not None:
+            # turnStatus must not flip to "waiting" before the mediator message lands
+            try:
+                mediator_future.result()
+            except Exception as e:
+                log.warning("⚠️ [PvP BG] Mediator injection failed: %s", e)
         try:
             final_update: Dict[str, Any] = {
                 "nextChips": chips if game_state == "active" else None,
@@ -1307,9 +2092,9 @@ def _pvp_background_work(
             if game_state == "active":
                 final_update["mediatorPhase"] = False
             case_ref.update(final_update)
-            print(f"✅ [PvP BG] Final update done. turnStatus=waiting, chips={'set' if chips else 'null'}, mediatorDeferred={game_state != 'active' and is_mediator_round}")
+            log.info("✅ [PvP BG] Final update done. turnStatus=waiting, chips=%s, mediatorDeferred=%s", 'set' if chips else 'null', game_state != 'active' and is_mediator_round)
         except Exception as e:
-            print(f"❌ [PvP BG] Failed to write final update: {e}")
+            log.error("❌ [PvP BG] Failed to write final update: %s", e)
 
 
 # =============================================================================
@@ -1348,6 +2133,7 @@ def run_pvp_negotiation_turn(
     db = get_db()
     case_ref = db.collection("cases").document(case_id)
     messages_ref = case_ref.collection("messages")
+    case_data = None  # Read by the error path below
 
     try:
         turn_started_at = time.monotonic()
@@ -1357,96 +2143,72 @@ def run_pvp_negotiation_turn(
         # =====================================================================
         emit("context", "Analyzing case context...")
 
-        case_data = case_ref.get().to_dict()
+        # Case doc, conversation history and evidence are independent — fetch concurrently
+        case_future = _TURN_POOL.submit(lambda: case_ref.get().to_dict())
+        history_future = _TURN_POOL.submit(_load_recent_history, messages_ref)
+        cached_evidence = _EVIDENCE_CACHE.get(case_id)
+        evidence_future = None
+        if cached_evidence is None:
+            evidence_future = _TURN_POOL.submit(_load_turn_evidence, case_ref)
+
+        case_data = case_future.result()
         case_title = case_data.get("title", "Dispute")
         case_type = case_data.get("caseType", "tenancy_deposit")
         claim_amount = case_data.get("amount", 0) or 0
         pvp_round = case_data.get("pvpRound", 1)
 
         # Get conversation history
-        history = []
-        messages_docs = messages_ref.order_by("createdAt").stream()
-        for msg_doc in messages_docs:
-            msg_data = msg_doc.to_dict()
-            history.append({
-                "role": msg_data.get("role"),
-                "content": msg_data.get("content"),
-                "round": msg_data.get("round"),
-            })
+        history = history_future.result()
+
+        # Start RAG now so it overlaps evidence/prompt prep and the directive write
+        emit("rag", "Searching legal database for relevant laws...")
+        rag_future = _TURN_POOL.submit(
+            _retrieve_turn_laws, case_type, case_title, user_message, history, emit
+        )
 
-        print(f"\n{'='*60}")
-        print(f"🎮 [PvP Round {pvp_round}] {user_role.upper()} turn for case {case_id}")
-        print(f"   Commander directive: {user_message[:80] if user_message else '(none)'}")
-        print(f"   Evidence URIs: {len(evidence_uris) if evidence_uris else 0}")
-        print(f"{'='*60}")
+        log.info("\n%s", '='*60)
+        log.info("🎮 [PvP Round %s] %s turn for case %s", pvp_round, user_role.upper(), case_id)
+        log.info("   Commander directive: %s", user_message[:80] if user_message else '(none)')
+        log.info("   Evidence URIs: %s", len(evidence_uris) if evidence_uris else 0)
+        log.info("%s", '='*60)
 
         # Get evidence context + file parts for Gemini multipart
-        evidence_docs = case_ref.collection("evidence").stream()
-        evidence_texts = []
-        evidence_file_parts = []  # (file_uri, mime_type) tuples for Gemini
-        for edoc in evidence_docs:
-            evidence_data = edoc.to_dict()
-            extracted = evidence_data.get("extractedText")
-            if extracted:
-                evidence_texts.append(extracted)
-            furi = evidence_data.get("file_uri")
-            fmime = evidence_data.get("fileType")
-            if furi and fmime:
-                evidence_file_parts.append((furi, fmime))
+        evidence_texts, evidence_file_parts = _turn_evidence(
+            case_id, case_ref, case_data, cached_evidence, evidence_future
+        )
 
-        clipped_evidence = [_clip_text(text, 700) for text in evidence_texts[:8] if text]
-        evidence_context = "\n".join(clipped_evidence) if clipped_evidence else "No evidence provided."
+        evidence_context = _render_evidence_context(evidence_texts)
         case_facts = f"Case Type: {case_type}\nTitle: {case_title}\nEvidence Summary: {evidence_context}"
 
         # Cap file parts at 5 to avoid oversized requests
         evidence_file_parts = evidence_file_parts[:5] if evidence_file_parts else None
-        print(f"   Evidence file parts: {len(evidence_file_parts) if evidence_file_parts else 0}")
+        evidence_cache = _evidence_context_cache(
+            case_id, case_data.get("evidenceVersion", 0), evidence_file_parts
+        )
+        log.info("   Evidence file parts: %s", len(evidence_file_parts) if evidence_file_parts else 0)
 
         # =====================================================================
-        # Step 2: Save user directive
+        # Step 2-3: Save user directive + set turn status to processing
         # =====================================================================
+        directive_payloads = []
         if user_message and user_message.strip():
-            print(f"📝 Saving {user_role} commander directive...")
-            messages_ref.add({
+            log.info("📝 Saving %s commander directive...", user_role)
+            directive_payloads.append({
                 "role": "directive",
                 "content": f"[{user_role.upper()}] {user_message.strip()}",
                 "round": pvp_round,
-                "createdAt": firestore.SERVER_TIMESTAMP,
+                "createdAt": _SERVER_TS,
             })
-
-        # =====================================================================
-        # Step 3: Set turn status to processing
-        # =====================================================================
-        case_ref.update({"turnStatus": "processing"})
+        # One commit instead of an add() followed by an update()
+        _commit_turn_batch(db, case_ref, directive_payloads, {"turnStatus": "processing"})
 
         # =====================================================================
         # Step 4: RAG - Search for relevant laws
         # =====================================================================
-        emit("rag", "Searching legal database for relevant laws...")
-        rag_parts = [case_type, case_title]
-        if user_message:
-            rag_parts.append(user_message)
-        rag_query = " ".join(rag_parts)
-        legal_docs = []
-        try:
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            future = executor.submit(retrieve_law, query=rag_query, history=history, use_agentic=True)
-            try:
-                legal_docs = future.result(timeout=45)
-            finally:
-                executor.shutdown(wait=False, cancel_futures=True)
-        except concurrent.futures.TimeoutError:
-            print(f"⏰ RAG search timed out")
-            emit("rag_warn", "⚠ Legal search timed out — proceeding without case law")
-        except Exception as e:
-            print(f"⚠️  RAG search error: {e}")
-            emit("rag_warn", f"⚠ Legal search failed — proceeding anyway")
+        legal_docs = rag_future.result()
 
         if legal_docs:
-            legal_context = "\n".join([
-                f"- {doc['law']} Section {doc['section']}: {doc['excerpt'][:300]}..."
-                for doc in legal_docs
-            ])
+            legal_context = _format_turn_legal_context(legal_docs)
         else:
             legal_context = "No specific laws retrieved. Rely on general contract principles."
 
@@ -1475,12 +2237,8 @@ def run_pvp_negotiation_turn(
         if time.monotonic() - turn_started_at > TURN_TOTAL_TIMEOUT_SEC:
             raise TimeoutError(f"Turn exceeded {TURN_TOTAL_TIMEOUT_SEC}s")
 
-        # Format conversation history for prompts (exclude directives)
-        conversation_history = "\n".join([
-            f"[{msg['role'].upper()}]: {msg['content']}"
-            for msg in history[-6:]
-            if msg['role'] != 'directive'
-        ])
+        # Format case facts + shared history once (exclude directives)
+        prompt_ctx = PromptContext.build(case_data_dict, history)
 
         # =====================================================================
         # Step 5: Generate AI response for this role
@@ -1491,18 +2249,15 @@ def run_pvp_negotiation_turn(
 
         if user_role == "plaintiff":
             emit("plaintiff", "Your agent is building legal arguments...")
-            print(f"🤖 [PvP Round {pvp_round}] Generating plaintiff response...")
+            log.info("🤖 [PvP Round %s] Generating plaintiff response...", pvp_round)
 
-            plaintiff_prompt = build_plaintiff_prompt(
-                case_data=case_data_dict,
-                current_round=pvp_round
-            )
+            plaintiff_prompt = prompt_ctx.role_prompt("plaintiff", pvp_round)
             directive_section = _build_directive_section(user_message, role="plaintiff")
 
             full_prompt = f"""{plaintiff_prompt}
 
 === CONVERSATION HISTORY ===
-{conversation_history}
+{prompt_ctx.history_snippet}
 {directive_section}
 
 === CURRENT SITUATION ===
@@ -1512,12 +2267,9 @@ Now argue as the Plaintiff. Remember to output ONLY valid JSON."""
 
         else:  # defendant
             emit("defendant", "Your agent is preparing defense...")
-            print(f"🤖 [PvP Round {pvp_round}] Generating defendant response...")
+            log.info("🤖 [PvP Round %s] Generating defendant response...", pvp_round)
 
-            defendant_prompt = build_defendant_prompt(
-                case_data=case_data_dict,
-                current_round=pvp_round
-            )
+            defendant_prompt = prompt_ctx.role_prompt("defendant", pvp_round)
             directive_section = _build_directive_section(user_message, role="defendant")
 
             # Get last plaintiff message for context
@@ -1527,7 +2279,7 @@ Now argue as the Plaintiff. Remember to output ONLY valid JSON."""
             full_prompt = f"""{defendant_prompt}
 
 === CONVERSATION HISTORY ===
-{conversation_history}
+{prompt_ctx.history_snippet}
 {directive_section}
 
 === CURRENT SITUATION ===
@@ -1538,25 +2290,27 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
 
         # Generate response
         try:
-            gen_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            gen_future = gen_executor.submit(
-                call_gemini_with_retry, full_prompt, 2, 30, progress_callback, evidence_file_parts
+            agent_audio = _EarlyRoleAudio(
+                case_id, pvp_round, user_role, _token_forwarder(progress_callback, f"{user_role}_token")
+            )
+            gen_future = _LLM_POOL.submit(
+                _generate_negotiation_reply, full_prompt, progress_callback, evidence_file_parts,
+                agent_audio, evidence_cache,
             )
             try:
                 raw_response = gen_future.result(timeout=90)
             finally:
-                gen_executor.shutdown(wait=False, cancel_futures=True)
+                gen_future.cancel()
 
             try:
-                cleaned = _extract_json_from_text(raw_response)
-                response_json = json.loads(cleaned)
-                agent_text = response_json.get("message", cleaned)
+                response_json = _parse_llm_json(raw_response)
+                agent_text = response_json.get("message", raw_response)
                 if user_role == "defendant":
                     game_eval = evaluate_game_state(response_json, floor_price or 0, current_round=pvp_round, max_rounds=MAX_ROUNDS)
                     counter_offer = game_eval["offer_amount"]
                 else:
                     counter_offer = response_json.get("counter_offer_rm")
-                print(f"✅ {user_role.capitalize()} JSON parsed. Offer: {counter_offer}")
+                log.info("✅ %s JSON parsed. Offer: %s", user_role.capitalize(), counter_offer)
             except json.JSONDecodeError:
                 agent_text = raw_response
                 counter_offer = None
@@ -1564,45 +2318,27 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
             agent_text = "I need a moment to review the case details. I maintain my current position."
             counter_offer = None
         except Exception as e:
-            print(f"❌ {user_role} generation failed: {e}")
+            log.error("❌ %s generation failed: %s", user_role, e)
             raise
 
         # =====================================================================
-        # Step 6: Save message & audit
+        # Step 6: TTS & audit
         # =====================================================================
-        print(f"💾 Saving {user_role} message...")
-        msg_ref = messages_ref.add({
-            "role": user_role,
-            "content": agent_text,
-            "round": pvp_round,
-            "counter_offer_rm": counter_offer,
-            "audio_url": None,  # Updated async below
-            "auditor_passed": None,
-            "auditor_warning": None,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-        })[1]
+        # TTS and the citation audit only need the text — start both right away
+        pvp_tts_future = agent_audio.audio_future(agent_text)
+        emit("auditor", f"Validating {user_role} legal citations...")
+        audit_future = _TURN_POOL.submit(validate_turn, agent_text)
+
 
         # =====================================================================
         # Step 7: Determine turn flip + round advancement
         # =====================================================================
-        opposite_role = "defendant" if user_role == "plaintiff" else "plaintiff"
-
         # After plaintiff submits → turn goes to defendant (same round)
         # After defendant submits → round advances, turn goes to plaintiff
-        if user_role == "plaintiff":
-            next_turn = "defendant"
-            next_round = pvp_round
-        else:
-            next_round = pvp_round + 1
-            next_turn = "plaintiff"
+        next_turn = _OPPOSITE_ROLE.get(user_role, "plaintiff")
+        next_round = pvp_round if user_role == "plaintiff" else pvp_round + 1
 
-        # Run TTS in background while auditor runs in main thread
-        pvp_tts_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        pvp_tts_future = pvp_tts_pool.submit(
-            generate_and_upload_role_audio, case_id, pvp_round, user_role, agent_text
-        )
-        emit("auditor", f"Validating {user_role} legal citations...")
-        audit_result = validate_turn(agent_text)
+        audit_result = audit_future.result()
         auditor_passed = audit_result["is_valid"]
         auditor_warning = None
 
@@ -1614,35 +2350,43 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
             audio_url = pvp_tts_future.result(timeout=25)
         except Exception:
             audio_url = None
-        finally:
-            pvp_tts_pool.shutdown(wait=False)
 
-        msg_ref.update({
+        message_payload = {
+            "role": user_role,
+            "content": agent_text,
+            "round": pvp_round,
+            "counter_offer_rm": counter_offer,
             "audio_url": audio_url,
             "auditor_passed": auditor_passed,
             "auditor_warning": auditor_warning if not auditor_passed else None,
-        })
+            "createdAt": _SERVER_TS,
+        }
 
         # =====================================================================
         # Step 8: Evaluate game state
         # =====================================================================
-        mediator_already_injected = any(m.get("role") == "mediator" for m in history)
+        # Only the recent tail of history is loaded, so rely on the case flag
+        # (set transactionally with the mediator message); probe legacy cases
+        mediator_already_injected = case_data.get("mediatorInjected")
+        if mediator_already_injected is None:
+            mediator_already_injected = _has_mediator_message(messages_ref)
         is_mediator_round = (user_role == "defendant" and pvp_round == 2
                              and not mediator_already_injected)
 
         game_state = "active"
+        case_updates: Dict[str, Any] = {}
 
         if user_role == "defendant" and game_eval.get("meets_floor"):
             game_state = "pending_accept"
-            case_ref.update({"game_state": "pending_accept", "pendingDecisionRole": "plaintiff"})
-            print(f"⏳ PvP: Plaintiff decision required! Offer ({counter_offer}) meets floor ({floor_price})")
+            case_updates["pendingDecisionRole"] = "plaintiff"
+            log.info("⏳ PvP: Plaintiff decision required! Offer (%s) meets floor (%s)", counter_offer, floor_price)
 
         if user_role == "plaintiff" and counter_offer is not None and game_state == "active":
             defendant_ceiling = int(case_data.get("defendantCeilingPrice") or 0)
             if defendant_ceiling > 0 and counter_offer <= defendant_ceiling:
                 game_state = "pending_accept"
-                case_ref.update({"game_state": "pending_accept", "pendingDecisionRole": "defendant"})
-                print(f"⏳ PvP: Defendant decision required! Plaintiff offer ({counter_offer}) within ceiling ({defendant_ceiling})")
+                case_updates["pendingDecisionRole"] = "defendant"
+                log.info("⏳ PvP: Defendant decision required! Plaintiff offer (%s) within ceiling (%s)", counter_offer, defendant_ceiling)
 
         if next_round > MAX_ROUNDS:
             next_round = MAX_ROUNDS  # Never write round 5+ to Firestore
@@ -1650,28 +2394,26 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
             # This overrides pending_accept too — no "Continue Negotiation" at round 4.
             if game_state != "settled":
                 game_state = "pending_decision"
-                print(f"⏰ Round {pvp_round} is the last round. Forcing final accept/reject decision screen.")
+                log.info("⏰ Round %s is the last round. Forcing final accept/reject decision screen.", pvp_round)
 
-        case_status = "active"
-        if game_state == "settled":
-            case_status = "done"
-        elif game_state == "pending_decision":
-            case_status = "pending_decision"
-        elif game_state == "pending_accept":
-            case_status = "pending_accept"
+        case_status = _GAME_TO_STATUS.get(game_state, "active")
 
         # =====================================================================
-        # Step 9: Early Firestore update — flip turn, chips=None (Phase 1 end)
+        # Step 9: Save the message and flip the turn in one commit (Phase 1 end)
         # Background thread (Phase 2) will set nextChips + turnStatus="waiting"
         # =====================================================================
-        case_ref.update({
+        log.info("💾 Saving %s message...", user_role)
+        case_updates.update({
             "currentTurn": next_turn,
-            "pvpRound": next_round,
             "turnStatus": "processing",   # Phase 2 will flip to "waiting"
             "status": case_status,
             "game_state": game_state,
             "mediatorPhase": is_mediator_round,
         })
+        if next_round > pvp_round:
+            # Server-side increment — never writes back a stale round read at turn start
+            case_updates["pvpRound"] = firestore.Increment(1)
+        _commit_turn_batch(db, case_ref, [message_payload], case_updates)
 
         # =====================================================================
         # Step 10: Launch Phase 2 background thread (chips + mediator + final)
@@ -1688,12 +2430,12 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         bg_thread.start()
 
         emit("complete", "Turn complete!")
-        print(f"✅ [PvP Round {pvp_round}] {user_role} turn complete. Next: {next_turn}, Round: {next_round}. BG thread started.")
+        log.info("✅ [PvP Round %s] %s turn complete. Next: %s, Round: %s. BG thread started.", pvp_round, user_role, next_turn, next_round)
 
         pending_decision_role = None
         if game_state == "pending_accept":
-            pending_decision_role = case_data_dict.get("pendingDecisionRole") or (
-                "plaintiff" if user_role == "defendant" else "defendant"
+            pending_decision_role = case_data_dict.get("pendingDecisionRole") or _OPPOSITE_ROLE.get(
+                user_role, "defendant"
             )
 
         return {
@@ -1713,7 +2455,7 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
 
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ [PvP Orchestrator] Turn error: {error_msg}")
+        log.error("❌ [PvP Orchestrator] Turn error: %s", error_msg)
         import traceback
         traceback.print_exc()
 
@@ -1728,7 +2470,7 @@ Now respond as the Defendant. Remember to output ONLY valid JSON."""
         return {
             "agent_message": f"System error: {error_msg}",
             "plaintiff_message": None,
-            "current_round": case_data.get("pvpRound", 1) if 'case_data' in dir() else 1,
+            "current_round": case_data.get("pvpRound", 1) if case_data is not None else 1,
             "audio_url": None,
             "auditor_passed": False,
             "auditor_warning": f"System error: {error_msg}",
@@ -1763,35 +2505,40 @@ def run_dumb_loop(case_id: str, mode: str = "mvp") -> None:
     case_ref = db.collection("cases").document(case_id)
     messages_ref = case_ref.collection("messages")
     
+    def _load_evidence_texts():
+        evidence_texts = []
+        for doc in case_ref.collection("evidence").select(["extractedText"]).stream():
+            extracted = doc.to_dict().get("extractedText")
+            if extracted:
+                evidence_texts.append(extracted)
+        return evidence_texts
+
     try:
-        # Update status to running
-        case_ref.update({"status": "running"})
-        
+        # Status update and evidence (if M4 uploaded any) don't depend on the
+        # case doc — run them alongside it
+        status_future = _TURN_POOL.submit(case_ref.update, {"status": "running"})
+        evidence_future = _TURN_POOL.submit(_load_evidence_texts)
+
         # =====================================================================
         # Retrieve case details and evidence
         # =====================================================================
         case_data = case_ref.get().to_dict()
         case_title = case_data.get("title", "Tenancy Deposit Dispute")
-        
-        # Retrieve evidence (if M4 uploaded any)
-        evidence_docs = case_ref.collection("evidence").stream()
-        evidence_texts = []
-        for doc in evidence_docs:
-            evidence_data = doc.to_dict()
-            extracted = evidence_data.get("extractedText")
-            if extracted:
-                evidence_texts.append(extracted)
-        
+
+        # Search for relevant laws using the case title — overlaps the evidence read
+        log.info("🔎 Retrieving laws for: %s", case_title)
+        rag_future = _TURN_POOL.submit(retrieve_law, case_title)
+
+        status_future.result()
+        evidence_texts = evidence_future.result()
         evidence_context = "\n".join(evidence_texts) if evidence_texts else "No evidence provided yet."
         
         # =====================================================================
         # ROUND 1: Plaintiff Turn
         # =====================================================================
-        print(f"[Orchestrator] Case {case_id}: Plaintiff speaking...")
+        log.info("[Orchestrator] Case %s: Plaintiff speaking...", case_id)
         
-        # Search for relevant laws using the case title
-        print(f"🔎 Retrieving laws for: {case_title}")
-        legal_docs = retrieve_law(case_title) 
+        legal_docs = rag_future.result()
         legal_context_str = "\n".join([f"- {d['law']} s.{d['section']}: {d['excerpt']}" for d in legal_docs])
 
         # ✅ Build plaintiff prompt using M1's function (Phase 1 simplified)
@@ -1814,27 +2561,25 @@ def run_dumb_loop(case_id: str, mode: str = "mvp") -> None:
 
         # Try to parse JSON
         try:
-            cleaned = plaintiff_text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            response_json = json.loads(cleaned)
+            response_json = _parse_llm_json(plaintiff_text)
             plaintiff_text = response_json.get("message", plaintiff_text)
         except:
             pass  # Use raw text if JSON parse fails
         
-        messages_ref.add({
+        # Counter lands with the message so run_negotiation_turn derives the right round
+        _commit_turn_batch(db, case_ref, [{
             "role": "plaintiff",
             "content": plaintiff_text,
             "round": 1,
-            "createdAt": firestore.SERVER_TIMESTAMP
-        })
+            "createdAt": _SERVER_TS
+        }], {"plaintiffMessageCount": firestore.Increment(1)})
         
-        print(f"[Orchestrator] Plaintiff: {plaintiff_text[:100]}...")
+        log.info("[Orchestrator] Plaintiff: %s...", plaintiff_text[:100])
         
         # =====================================================================
         # ROUND 1: Defendant Turn
         # =====================================================================
-        print(f"[Orchestrator] Case {case_id}: Defendant responding...")
+        log.info("[Orchestrator] Case %s: Defendant responding...", case_id)
         
         defendant_prompt = f"""{build_defendant_prompt(
             case_data=case_data_dict,
@@ -1853,10 +2598,7 @@ def run_dumb_loop(case_id: str, mode: str = "mvp") -> None:
         
         # Try to parse JSON
         try:
-            cleaned = defendant_text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            response_json = json.loads(cleaned)
+            response_json = _parse_llm_json(defendant_text)
             defendant_text = response_json.get("message", defendant_text)
         except:
             pass
@@ -1865,10 +2607,10 @@ def run_dumb_loop(case_id: str, mode: str = "mvp") -> None:
             "role": "defendant",
             "content": defendant_text,
             "round": 1,
-            "createdAt": firestore.SERVER_TIMESTAMP
+            "createdAt": _SERVER_TS
         })
         
-        print(f"[Orchestrator] Defendant: {defendant_text[:100]}...")
+        log.info("[Orchestrator] Defendant: %s...", defendant_text[:100])
         
         # =====================================================================
         # End of Phase 1 Loop
@@ -1876,22 +2618,18 @@ def run_dumb_loop(case_id: str, mode: str = "mvp") -> None:
         # Update case status to done
         case_ref.update({"status": "done"})
         
-        print(f"✅ [Orchestrator] Dumb loop completed for case {case_id}")
+        log.info("✅ [Orchestrator] Dumb loop completed for case %s", case_id)
         
     except Exception as e:
         # Error handling: Update case status to error
-        print(f"❌ [Orchestrator] Error in case {case_id}: {str(e)}")
-        case_ref.update({
-            "status": "error",
-        })
-        
-        # Write error message to messages collection
-        messages_ref.add({
+        log.error("❌ [Orchestrator] Error in case %s: %s", case_id, str(e))
+        # Error message and status flip land in one commit
+        _commit_turn_batch(db, case_ref, [{
             "role": "system",
             "content": f"Error occurred: {str(e)}",
             "round": 0,
-            "createdAt": firestore.SERVER_TIMESTAMP
-        })
+            "createdAt": _SERVER_TS
+        }], {"status": "error"})
 
 # phase 1.5+: RAG-enabled negotiation
 def run_case(case_id: str, mode: str = "mvp") -> None:
@@ -1903,10 +2641,10 @@ def run_case(case_id: str, mode: str = "mvp") -> None:
     This allows gradual migration to Phase 2.
     """
     if mode == "full" and GRAPH_AVAILABLE:
-        print(f"[Orchestrator] Running FULL mode with RAG for case {case_id}")
+        log.info("[Orchestrator] Running FULL mode with RAG for case %s", case_id)
         run_negotiation_with_rag(case_id, mode)
     else:
-        print(f"[Orchestrator] Running MVP mode (simple loop) for case {case_id}")
+        log.info("[Orchestrator] Running MVP mode (simple loop) for case %s", case_id)
         run_dumb_loop(case_id, mode)
         
 # =============================================================================
@@ -3,25 +3,32 @@ Agent Graph (Phase 1.5 - Optional RAG Integration)
 Phase 1: Simple 2-turn loop with optional law retrieval
 Phase 2: Extended state tracking for turn-based negotiation
 """
+import concurrent.futures
+import functools
+import hashlib
 import os
 from typing import TypedDict, List, Annotated
 from firebase_admin import firestore
-from google import genai
 from typing import Optional
 
 # Import M1's prompts
 from backend.prompts.plaintiff import build_plaintiff_prompt
 from backend.prompts.defendant import build_defendant_prompt
 from backend.prompts.mediator import build_mediator_prompt  # For Phase 2
+from backend.core.ttl_cache import TTLCache
+from backend.core.logging_setup import get_logger
+from backend.graph.llm_cache import cached_generate
+
+log = get_logger("graph")
 
 # Import M2's RAG 
 try:
     from backend.rag.retrieval import retrieve_law
     RAG_AVAILABLE = True
-    print("✅ RAG module loaded successfully")
+    log.info("✅ RAG module loaded successfully")
 except ImportError:
     RAG_AVAILABLE = False
-    print("⚠️  RAG module not available - using mock mode")
+    log.warning("⚠️  RAG module not available - using mock mode")
     
     # Mock fallback for Phase 1
     def retrieve_law(query: str) -> List[dict]:
@@ -31,10 +38,14 @@ except ImportError:
             "excerpt": "When a contract has been broken, compensation is due."
         }]
 
-# Initialize Gemini
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
+# Formatted law text per (case_title, evidence) — re-runs of a case skip RAG entirely
+_LAW_CONTEXT_CACHE = TTLCache(maxsize=1024, ttl=86400)
+
+# Firestore reads that can overlap each other (tasks never wait on each other)
+_GRAPH_IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="graph-io")
+
 
 # =============================================================================
 # State Definition (phase2 extended)
@@ -62,6 +73,9 @@ class NegotiationState(TypedDict):
     auditor_passed: bool  # Whether last response passed validation
     auditor_warning: Optional[str]  # Auditor warning message if failed
     audio_url: Optional[str]  # Audio file URL from TTS
+    last_plaintiff_message: Optional[str]  # What the defendant responds to
+    case_data: dict  # Prompt-builder case fields, shared by both role nodes
+    pending_messages: List[dict]  # Message payloads committed in one batch at the end of the run
 
 
 # =============================================================================
@@ -72,6 +86,11 @@ def get_db():
     return firestore.client()
 
 
+# ~512 embedding tokens; the title and the start of the evidence carry the dispute
+RAG_QUERY_MAX_CHARS = 2048
+_LAW_TEMPLATE = "Law: {law}\nSection: {section}\nContent: {excerpt}"
+
+
 def retrieve_laws_for_case(case_title: str, evidence: str, history: List[dict] = None) -> str:
     """
     Phase 1.5: Retrieve relevant laws using M2's RAG.
@@ -85,11 +104,20 @@ def retrieve_laws_for_case(case_title: str, evidence: str, history: List[dict] =
         Formatted law text for prompt injection
     """
     if not RAG_AVAILABLE:
-        print("⚠️  Using mock law retrieval (RAG not available)")
+        log.warning("⚠️  Using mock law retrieval (RAG not available)")
         return "Section 75 of Contracts Act 1950: Compensation for breach."
     
-    # Construct search query
-    query = f"{case_title} {evidence}"
+    # Construct search query — capped so long evidence dumps don't dilute the embedding
+    query = f"{case_title} {evidence}"[:RAG_QUERY_MAX_CHARS]
+    
+    # History-aware lookups depend on the conversation, so only direct queries are cached
+    cache_key = None
+    if not history:
+        cache_key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        cached = _LAW_CONTEXT_CACHE.get(cache_key)
+        if cached is not None:
+            log.info("💾 Law context cache hit")
+            return cached
     
     # Call M2's retrieve_law function (with history if available)
     if history:
@@ -98,16 +126,32 @@ def retrieve_laws_for_case(case_title: str, evidence: str, history: List[dict] =
         results = retrieve_law(query, use_agentic=False)
     
     # Format as readable text for prompt
-    formatted_laws = []
-    for result in results:
-        law_text = f"""
-Law: {result['law']}
-Section: {result['section']}
-Content: {result['excerpt']}
-"""
-        formatted_laws.append(law_text.strip())
-    
-    return "\n\n".join(formatted_laws) if formatted_laws else "No relevant laws found."
+    law_context = "\n\n".join(_LAW_TEMPLATE.format_map(result).strip() for result in results)
+    if not law_context:
+        # Empty results may be a transient RAG failure — don't cache them
+        return "No relevant laws found."
+    if cache_key is not None:
+        _LAW_CONTEXT_CACHE.set(cache_key, law_context)
+    return law_context
+
+
+def _case_data(state: NegotiationState) -> dict:
+    """Prompt-builder case fields for this run — built on first use and kept on the state."""
+    case_data = state.get("case_data")
+    if case_data is None:
+        case_data = {
+            "case_title": state["case_title"],
+            "case_type": state.get("case_type", "tenancy_deposit"),
+            "incident_date": "",
+            "dispute_amount": 0,
+            "short_description": state["case_title"],
+            "case_facts": f"Case: {state['case_title']}",
+            "evidence_summary": state["evidence_context"],
+            "floor_price": state.get("floor_price", 0),
+            "legal_context": state["law_context"],
+        }
+        state["case_data"] = case_data
+    return case_data
 
 
 # =============================================================================
@@ -119,59 +163,30 @@ def plaintiff_node(state: NegotiationState) -> NegotiationState:
     Phase 1.5: Uses law context from RAG.
     Phase 2: Uses M1's build_plaintiff_prompt with full context.
     """
-    db = get_db()
-    case_ref = db.collection("cases").document(state["case_id"])
-    messages_ref = case_ref.collection("messages")
-    
-    print(f"[Graph] Plaintiff speaking (Round {state['round']})...")
+    log.info("[Graph] Plaintiff speaking (Round %s)...", state["round"])
     
-    # Build case data dict for M1's prompt builder
-    case_data_dict = {
-        "case_title": state["case_title"],
-        "case_type": state.get("case_type", "tenancy_deposit"),
-        "incident_date": "",
-        "dispute_amount": 0,
-        "short_description": state["case_title"],
-        "case_facts": f"Case: {state['case_title']}",
-        "evidence_summary": state["evidence_context"],
-        "floor_price": state.get("floor_price", 0),
-        "legal_context": state["law_context"],
-    }
+    # Case data dict for M1's prompt builder (built once per run)
+    case_data_dict = _case_data(state)
     # Use M1's prompt builder
     prompt = build_plaintiff_prompt(
         case_data=case_data_dict,
         current_round=state["round"]
     )
 
-# Case Title: {state['case_title']}
-# Evidence: {state['evidence_context']}
-
-# Relevant Malaysian Laws:
-# {state['law_context']}
-
-# Based on the above laws and evidence, make your opening argument as the landlord.
-# Keep your response under 300 words."""
-
     # Generate response
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=prompt
-    )
+    response_text = cached_generate(prompt, model=MODEL)
     
-    plaintiff_text = response.text
-     # Parse JSON if available
+    plaintiff_text = response_text
+    # Parse JSON if available
+    from backend.core.orchestrator import _parse_llm_json  # local: orchestrator imports this module
     try:
-        import json
-        cleaned = plaintiff_text.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-        response_json = json.loads(cleaned)
+        response_json = _parse_llm_json(plaintiff_text)
         plaintiff_text = response_json.get("message", plaintiff_text)
-    except:
-        pass
+    except (ValueError, TypeError, AttributeError):
+        pass  # Use raw text if the reply isn't a JSON object
 
-    # Save to Firestore
-    messages_ref.add({
+    # Queued for the run's single batch commit
+    state["pending_messages"].append({
         "role": "plaintiff",
         "content": plaintiff_text,
         "round": state["round"],
@@ -183,8 +198,9 @@ def plaintiff_node(state: NegotiationState) -> NegotiationState:
         "role": "plaintiff",
         "content": plaintiff_text
     })
+    state["last_plaintiff_message"] = plaintiff_text
     
-    print(f"[Graph] Plaintiff: {plaintiff_text[:100]}...")
+    log.debug("[Graph] Plaintiff: %.100s...", plaintiff_text)
     
     return state
 
@@ -195,24 +211,13 @@ def defendant_node(state: NegotiationState) -> NegotiationState:
     Phase 1.5: Uses law context from RAG.
     Phase 2: Uses M1's build_defendant_prompt with validation.
     """
-    db = get_db()
-    case_ref = db.collection("cases").document(state["case_id"])
-    messages_ref = case_ref.collection("messages")
+    log.info("[Graph] Defendant responding (Round %s)...", state["round"])
     
-    print(f"[Graph] Defendant responding (Round {state['round']})...")
+    # Respond to the plaintiff specifically, whatever was appended to messages last
+    plaintiff_msg = state.get("last_plaintiff_message") or "No previous message"
     
-    # Get plaintiff's last message
-    plaintiff_msg = state["messages"][-1]["content"] if state["messages"] else "No previous message"
-    
-    # Build case data dict for M1's prompt builder
-    case_data_dict = {
-        "case_title": state["case_title"],
-        "case_type": state.get("case_type", "tenancy_deposit"),
-        "case_facts": f"Case: {state['case_title']}",
-        "evidence_summary": state["evidence_context"],
-        "floor_price": state.get("floor_price", 0),
-        "legal_context": state["law_context"],
-    }
+    # Case data dict for M1's prompt builder (built once per run)
+    case_data_dict = _case_data(state)
     
     # Use M1's prompt builder
     prompt = build_defendant_prompt(
@@ -228,27 +233,21 @@ The plaintiff argued:
 Respond to their argument."""
 
     # Generate response
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=full_prompt
-    )
+    response_text = cached_generate(full_prompt, model=MODEL)
     
-    defendant_text = response.text
+    defendant_text = response_text
 
     # Parse JSON if available
+    from backend.core.orchestrator import _parse_llm_json  # local: orchestrator imports this module
     try:
-        import json
-        cleaned = defendant_text.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-        response_json = json.loads(cleaned)
+        response_json = _parse_llm_json(defendant_text)
         defendant_text = response_json.get("message", defendant_text)
         state["counter_offer"] = response_json.get("counter_offer_rm")
-    except:
+    except (ValueError, TypeError, AttributeError):
         state["counter_offer"] = None
 
-    # Save to Firestore
-    messages_ref.add({
+    # Queued for the run's single batch commit
+    state["pending_messages"].append({
         "role": "defendant",
         "content": defendant_text,
         "round": state["round"],
@@ -262,7 +261,7 @@ Respond to their argument."""
         "content": defendant_text
     })
     
-    print(f"[Graph] Defendant: {defendant_text[:100]}...")
+    log.debug("[Graph] Defendant: %.100s...", defendant_text)
     
     return state
 
@@ -314,12 +313,23 @@ def run_negotiation_with_rag(case_id: str, mode: str = "mvp") -> None:
     Note: Phase 2's /next-turn endpoint uses orchestrator.run_negotiation_turn()
           This function is only used for /run endpoint (mode="full")
     """
+    from backend.core.orchestrator import _commit_turn_batch  # local: orchestrator imports this module
+
     db = get_db()
     case_ref = db.collection("cases").document(case_id)
     
+    def _load_evidence_texts():
+        evidence_texts = []
+        for doc in case_ref.collection("evidence").select(["extractedText"]).stream():
+            extracted = doc.to_dict().get("extractedText")
+            if extracted:
+                evidence_texts.append(extracted)
+        return evidence_texts
+
     try:
-        # Update status
-        case_ref.update({"status": "running"})
+        # Status update and evidence read run alongside the case doc read
+        status_future = _GRAPH_IO_POOL.submit(case_ref.update, {"status": "running"})
+        evidence_future = _GRAPH_IO_POOL.submit(_load_evidence_texts)
         
         # =====================================================================
         # Step 1: Retrieve case data
@@ -328,23 +338,16 @@ def run_negotiation_with_rag(case_id: str, mode: str = "mvp") -> None:
         case_title = case_data.get("title", "Tenancy Deposit Dispute")
         case_type = case_data.get("case_type", "tenancy_deposit")
         
-        # Get evidence
-        evidence_docs = case_ref.collection("evidence").stream()
-        evidence_texts = []
-        for doc in evidence_docs:
-            evidence_data = doc.to_dict()
-            extracted = evidence_data.get("extractedText")
-            if extracted:
-                evidence_texts.append(extracted)
-        
+        status_future.result()
+        evidence_texts = evidence_future.result()
         evidence_context = "\n".join(evidence_texts) if evidence_texts else "No evidence provided."
         
         # =====================================================================
         # Step 2: Retrieve relevant laws (M2's RAG) 🆕
         # =====================================================================
-        print(f"[Graph] Retrieving laws for case: {case_title}")
+        log.info("[Graph] Retrieving laws for case: %s", case_title)
         law_context = retrieve_laws_for_case(case_title, evidence_context)
-        print(f"[Graph] Retrieved {len(law_context)} characters of law text")
+        log.info("[Graph] Retrieved %s characters of law text", len(law_context))
         
         # =====================================================================
         # Step 3: Initialize state
@@ -367,6 +370,8 @@ def run_negotiation_with_rag(case_id: str, mode: str = "mvp") -> None:
             "auditor_passed": True,
             "auditor_warning": None,
             "audio_url": None,
+            "last_plaintiff_message": None,
+            "pending_messages": [],
         }
         
         # =====================================================================
@@ -378,31 +383,36 @@ def run_negotiation_with_rag(case_id: str, mode: str = "mvp") -> None:
         state = defendant_node(state)
         
         # =====================================================================
-        # Step 5: Mark as done
+        # Step 5: Save both messages and mark as done in one commit
         # =====================================================================
-        case_ref.update({"status": "done"})
-        print(f"✅ [Graph] Negotiation completed for case {case_id}")
+        # Keep the plaintiff counter in step so run_negotiation_turn derives the right round
+        plaintiff_added = sum(1 for m in state["pending_messages"] if m["role"] == "plaintiff")
+        _commit_turn_batch(db, case_ref, state["pending_messages"], {
+            "status": "done",
+            "plaintiffMessageCount": firestore.Increment(plaintiff_added),
+        })
+        log.info("✅ [Graph] Negotiation completed for case %s", case_id)
         
     except Exception as e:
-        print(f"❌ [Graph] Error in case {case_id}: {str(e)}")
-        case_ref.update({"status": "error"})
-        
-        # Save error message
-        case_ref.collection("messages").add({
+        log.error("❌ [Graph] Error in case %s: %s", case_id, e)
+        # Save error message and flip status together
+        _commit_turn_batch(db, case_ref, [{
             "role": "system",
             "content": f"Error occurred: {str(e)}",
             "round": 0,
             "createdAt": firestore.SERVER_TIMESTAMP
-        })
+        }], {"status": "error"})
 
 
 # =============================================================================
 # Phase 2 Preview: Multi-round graph (NOT USED YET)
 # =============================================================================
+@functools.lru_cache(maxsize=1)
 def build_negotiation_graph():
     """
     Phase 2: Full LangGraph implementation.
     This is just a preview - NOT USED in current implementation.
+    Compiled once; later calls return the same graph.
     """
     try:
         from langgraph.graph import StateGraph, END
@@ -425,7 +435,7 @@ def build_negotiation_graph():
     
         return graph.compile()
     except ImportError:
-        print("⚠️  LangGraph not available. Use orchestrator.run_negotiation_turn() instead.")
+        log.warning("⚠️  LangGraph not available. Use orchestrator.run_negotiation_turn() instead.")
         return None
 
 
@@ -0,0 +1,87 @@
+"""
+Prompt-keyed response cache for the agent graph's Gemini calls.
+Tier 1 is an in-process TTLCache; tier 2 is the Firestore `llm_cache`
+collection, so hits survive restarts and are shared across uvicorn workers.
+Only exact prompts hit — see cached_generate for why there is no semantic tier.
+"""
+import concurrent.futures
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+
+from backend.core.gemini_client import get_gemini_client
+from backend.core.logging_setup import get_logger
+from backend.core.ttl_cache import TTLCache
+
+log = get_logger("llm_cache")
+
+MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+LLM_CACHE_COLLECTION = "llm_cache"
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_SEC", "86400"))
+
+_LOCAL_CACHE = TTLCache(maxsize=1024, ttl=LLM_CACHE_TTL_SEC)
+# Firestore writes happen off the hot path
+_PERSIST_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-cache")
+
+
+def _prompt_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}|{prompt}".encode("utf-8")).hexdigest()
+
+
+def _persist(doc_ref, model: str, text: str) -> None:
+    try:
+        doc_ref.set({
+            "model": model,
+            "response": text,
+            "createdAt": firestore.SERVER_TIMESTAMP,
+            # Also usable as a Firestore TTL-policy field
+            "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=LLM_CACHE_TTL_SEC),
+        })
+    except Exception as e:
+        log.warning("⚠️ LLM cache write skipped: %s", e)
+
+
+def _read_persisted(doc_ref):
+    try:
+        snapshot = doc_ref.get()
+    except Exception as e:
+        log.warning("⚠️ LLM cache read skipped: %s", e)
+        return None
+    if not snapshot.exists:
+        return None
+    data = snapshot.to_dict() or {}
+    expires_at = data.get("expiresAt")
+    if expires_at is not None and expires_at <= datetime.now(timezone.utc):
+        return None
+    return data.get("response") or None
+
+
+def cached_generate(prompt: str, model: str = MODEL) -> str:
+    """Gemini response text for `prompt`, reusing any earlier response to the identical prompt.
+
+    There is deliberately no embedding-similarity tier: prompts for different
+    rounds, amounts or parties differ by only a few tokens, so near-duplicates
+    embed well above any useful cosine threshold and would return another
+    turn's reply.
+    """
+    key = _prompt_key(model, prompt)
+    cached = _LOCAL_CACHE.get(key)
+    if cached is not None:
+        log.info("💾 LLM cache hit (memory)")
+        return cached
+
+    doc_ref = firestore.client().collection(LLM_CACHE_COLLECTION).document(key)
+    cached = _read_persisted(doc_ref)
+    if cached is not None:
+        log.info("💾 LLM cache hit (Firestore)")
+        _LOCAL_CACHE.set(key, cached)
+        return cached
+
+    response = get_gemini_client().models.generate_content(model=model, contents=prompt)
+    text = response.text
+    if text:
+        _LOCAL_CACHE.set(key, text)
+        _PERSIST_POOL.submit(_persist, doc_ref, model, text)
+    return text
@@ -1,18 +1,41 @@
+import hashlib
+import io
 import os
 import mimetypes
-import tempfile
+import threading
 import requests
 from google import genai
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from backend.core.gemini_client import get_gemini_client
+from backend.core.ttl_cache import TTLCache
 
 MAX_FILE_SIZE_MB = 5
 MAX_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
-ALLOWED_EXACT_MIME_TYPES = {
+ALLOWED_EXACT_MIME_TYPES = frozenset({
     "application/pdf",
     "text/plain",
     "text/markdown",
-}
-_FILE_URI_CACHE: dict[str, str] = {}
+})
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+# Gemini File API uploads expire after 48h, so cached URIs are dropped a little before that
+FILE_URI_TTL_SEC = 47 * 3600
+# Content digest -> File API URI: identical bytes are uploaded once
+_FILE_URI_CACHE = TTLCache(maxsize=1024, ttl=FILE_URI_TTL_SEC)
+# Evidence URL -> (etag, file_uri, mime_type): an unchanged URL answers 304 and skips the download
+_URL_ETAG_CACHE = TTLCache(maxsize=1024, ttl=FILE_URI_TTL_SEC)
+
+# Shared session so evidence downloads reuse pooled connections (no per-file TLS handshake)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = requests.Session()
+    return _http_session
 
 
 def _normalize_mime_type(content_type: str) -> str:
@@ -28,8 +51,17 @@ def _is_supported_mime_type(mime_type: str) -> bool:
     return mime_type.startswith("image/") or mime_type in ALLOWED_EXACT_MIME_TYPES
 
 
-def _download_file_with_limit(file_url: str) -> tuple[bytes, str]:
-    response = requests.get(file_url, stream=True, timeout=20)
+def _download_file_with_limit(file_url: str, etag: Optional[str] = None) -> tuple[Optional[bytes], str, Optional[str]]:
+    """(bytes, mime_type, etag). bytes is None when the server confirms `etag` is still current."""
+    headers = {"If-None-Match": etag} if etag else None
+    with _get_http_session().get(file_url, stream=True, timeout=20, headers=headers) as response:
+        if etag and response.status_code == 304:
+            return None, "", etag
+        file_bytes, mime_type = _read_limited_response(response, file_url)
+        return file_bytes, mime_type, response.headers.get("ETag")
+
+
+def _read_limited_response(response: requests.Response, file_url: str) -> tuple[bytes, str]:
     response.raise_for_status()
 
     mime_type = _normalize_mime_type(response.headers.get("Content-Type", ""))
@@ -49,7 +81,7 @@ def _download_file_with_limit(file_url: str) -> tuple[bytes, str]:
                 raise ValueError(f"Evidence rejected: File exceeds the {MAX_FILE_SIZE_MB}MB limit.")
 
     chunks = bytearray()
-    for chunk in response.iter_content(chunk_size=8192):
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
         if not chunk:
             continue
         chunks.extend(chunk)
@@ -60,24 +92,21 @@ def _download_file_with_limit(file_url: str) -> tuple[bytes, str]:
 
 
 def _upload_to_gemini_file_api(client: genai.Client, file_url: str, file_bytes: bytes, mime_type: str) -> str:
-    cached_uri = _FILE_URI_CACHE.get(file_url)
+    # Keyed by content, not name/URL — different files can share a filename
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    cached_uri = _FILE_URI_CACHE.get((digest, mime_type))
     if cached_uri:
         return cached_uri
 
-    suffix = mimetypes.guess_extension(mime_type) or ""
-    temp_file_path = ""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file.write(file_bytes)
-            temp_file_path = temp_file.name
-
-        uploaded = client.files.upload(file=temp_file_path, config={"mime_type": mime_type})
-        file_uri = uploaded.uri
-        _FILE_URI_CACHE[file_url] = file_uri
-        return file_uri
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+    # Upload straight from memory — no temp file write/read/remove
+    config = {"mime_type": mime_type}
+    display_name = os.path.basename(file_url.split("?", 1)[0])[:128]
+    if display_name:
+        config["display_name"] = display_name
+    uploaded = client.files.upload(file=io.BytesIO(file_bytes), config=config)
+    file_uri = uploaded.uri
+    _FILE_URI_CACHE.set((digest, mime_type), file_uri)
+    return file_uri
 
 def validate_evidence(file_url: str, user_claim: str) -> Dict[str, Any]:
     """
@@ -96,8 +125,9 @@ def validate_evidence(file_url: str, user_claim: str) -> Dict[str, Any]:
             "error": "System configuration error: Missing GEMINI_API_KEY/GOOGLE_API_KEY."
         }
 
+    cached = _URL_ETAG_CACHE.get(file_url)
     try:
-        file_bytes, mime_type = _download_file_with_limit(file_url)
+        file_bytes, mime_type, etag = _download_file_with_limit(file_url, cached[0] if cached else None)
     except ValueError as e:
         return {
             "is_relevant": False,
@@ -115,10 +145,23 @@ def validate_evidence(file_url: str, user_claim: str) -> Dict[str, Any]:
             "error": f"System failed to load the file URL: {str(e)}"
         }
 
-    client = genai.Client(api_key=api_key)
+    if file_bytes is None:
+        # 304 Not Modified — the earlier upload of this URL is still valid
+        _, file_uri, mime_type = cached
+        return {
+            "is_relevant": True,
+            "confidence_score": 1.0,
+            "file_uri": file_uri,
+            "mime_type": mime_type,
+            "error": None,
+        }
+
+    client = get_gemini_client(api_key)
 
     try:
         file_uri = _upload_to_gemini_file_api(client, file_url, file_bytes, mime_type)
+        if etag:
+            _URL_ETAG_CACHE.set(file_url, (etag, file_uri, mime_type))
         return {
             "is_relevant": True,
             "confidence_score": 1.0,
@@ -1,10 +1,10 @@
 import os
 import json
-import google.genai as genai
 from google.genai import types
+from backend.core.gemini_client import get_gemini_client
 
 def extract_evidence_facts(file_path):
-    client = genai.Client(api_key="YOUR_API_KEY")
+    client = get_gemini_client()
     
     # M1 Logic: The "Vision Prompt"
     # We ask for JSON so M3 (Backend) can save it easily to Firestore.
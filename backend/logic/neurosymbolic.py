@@ -1,7 +1,21 @@
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
+
+# Thousands separators ("2,000"); surrounding whitespace is stripped separately
+_OFFER_STRIP = str.maketrans("", "", ",")
+# Small-claims amounts never come close; longer strings are rejected before int()
+OFFER_MAX_CHARS = 12
+
+# Shared read-only results for the common "no structured offer" case
+_NO_OFFER = MappingProxyType({"has_offer": False, "offer_amount": None, "meets_floor": False, "final_round": False})
+_NO_OFFER_FINAL = MappingProxyType({"has_offer": False, "offer_amount": None, "meets_floor": False, "final_round": True})
 
 
 def _to_int_offer(value: Any) -> Optional[int]:
+    # Fast path: JSON mode almost always hands back a plain int
+    if type(value) is int:
+        return value if value >= 0 else None
+
     if value is None:
         return None
 
@@ -13,15 +27,16 @@ def _to_int_offer(value: Any) -> Optional[int]:
         return amount if amount >= 0 else None
 
     if isinstance(value, str):
-        cleaned = value.replace(",", "").strip()
-        if cleaned.isdigit():
-            amount = int(cleaned)
-            return amount if amount >= 0 else None
+        cleaned = value.translate(_OFFER_STRIP).strip()
+        # int() alone would also take "1_000", "+5" and non-ASCII digits
+        if len(cleaned) > OFFER_MAX_CHARS or not (cleaned.isascii() and cleaned.isdigit()):
+            return None
+        return int(cleaned)
 
     return None
 
 
-def evaluate_game_state(agent_output: Dict[str, Any], floor_price: int, current_round: int = 1, max_rounds: int = 4) -> Dict[str, Any]:
+def evaluate_game_state(agent_output: Dict[str, Any], floor_price: int, current_round: int = 1, max_rounds: int = 4) -> Mapping[str, Any]:
     """
     Evaluates offer state using structured model output, e.g.:
     {
@@ -32,21 +47,23 @@ def evaluate_game_state(agent_output: Dict[str, Any], floor_price: int, current_
     At the final round (current_round >= max_rounds), always report
     has_offer=True so the accept/reject UI is shown regardless of
     whether the offer meets the floor price.
+
+    The no-offer result is a shared read-only mapping; use dict(result)
+    to get a mutable copy.
     """
     offer = _to_int_offer(agent_output.get("counter_offer_rm"))
+    final_round = current_round >= max_rounds
 
     if offer is None:
         # Even with no numeric offer at the final round, signal that
         # the negotiation must end so the decision screen appears.
-        if current_round >= max_rounds:
-            return {"has_offer": False, "offer_amount": None, "meets_floor": False, "final_round": True}
-        return {"has_offer": False, "offer_amount": None, "meets_floor": False, "final_round": False}
+        return _NO_OFFER_FINAL if final_round else _NO_OFFER
 
     return {
         "has_offer": True,
         "offer_amount": offer,
         "meets_floor": offer >= floor_price,
-        "final_round": current_round >= max_rounds,
+        "final_round": final_round,
     }
 
 
@@ -1,25 +1,9 @@
-def build_defendant_prompt(case_data: dict, current_round: int) -> str:
-    case_title = case_data.get("case_title", "")
-    case_description = case_data.get("case_description", "")
-    evidence_summary = case_data.get("evidence_summary", "")
-    max_offer = case_data.get("defendant_max_offer", 0)
-    legal_context = case_data.get("legal_context", "")
-    defendant_description = case_data.get("defendant_description", "")
-    defendant_starting_offer = case_data.get("defendant_starting_offer")
-
-    defendant_context = ""
-    if defendant_description:
-        defendant_context += f"\nDefendant's Account: {defendant_description}"
-    if defendant_starting_offer:
-        defendant_context += f"\nDefendant's Initial Offer: RM {defendant_starting_offer}"
-
-    base_persona = f"""
+_BASE_PERSONA = """
 You are the Defendant negotiation agent in a Malaysian Small Claims dispute.
 
 Case Title: {case_title}
-Case Description: {case_description if case_description else "Not provided."}
+Case Description: {case_description}
 Evidence Summary: {evidence_summary}
-Legal Context: {legal_context}
 {defendant_context}
 
 CITATION RULES:
@@ -35,35 +19,35 @@ STYLE RULES:
 - Conversational but professional tone.
 
 Secret Maximum Offer: RM {max_offer}
+Legal Context: {legal_context}
 Round: {current_round} of 4
 """
 
-    if current_round == 1:
-        round_directive = """
+_ROUND_1_DIRECTIVE = """
 GOAL (Round 1 — Professional Defense):
 - Respond directly to the plaintiff's claim with a professional tone.
 - Present factual challenges to specific claims. Be precise.
 - Acknowledge undisputed facts to build credibility — don't deny everything.
 - No premature offers. Establish your defensive position first.
 """
-    elif current_round == 2:
-        round_directive = """
+
+_ROUND_2_DIRECTIVE = """
 GOAL (Round 2 — Strategic Counter):
 - Use selective citations (1-2 max) for your strongest legal points.
 - Point out evidence gaps or weaknesses in the plaintiff's case.
 - Acknowledge any valid points briefly, then explain why they don't warrant the full claim.
 - Make a reasonable counter-offer that shows willingness to resolve.
 """
-    elif current_round == 3:
-        round_directive = f"""
+
+_ROUND_3_DIRECTIVE = """
 GOAL (Round 3 — Mediator-Informed Compromise):
 - Consider the mediator's guidance where applicable.
 - Compromise on secondary points to show good faith.
 - Frame your offer as "this avoids court costs and delays for both of us."
 - Stay within your maximum offer of RM {max_offer}.
 """
-    else:
-        round_directive = f"""
+
+_ROUND_4_DIRECTIVE = """
 GOAL (Round 4 — Final Offer with Counter-BATNA):
 - Deploy counter-BATNA: "The plaintiff faces the burden of proof on disputed items. Court takes months and the outcome is uncertain for both sides. Settling now is the pragmatic choice."
 - Make your final offer. Never exceed RM {max_offer}.
@@ -71,7 +55,10 @@ GOAL (Round 4 — Final Offer with Counter-BATNA):
 - Frame acceptance as avoiding risk and delay for the plaintiff.
 """
 
-    output_format = """
+# Indexed by round - 1; rounds 3-4 carry a {max_offer} placeholder
+_ROUND_DIRECTIVES = (_ROUND_1_DIRECTIVE, _ROUND_2_DIRECTIVE, _ROUND_3_DIRECTIVE, _ROUND_4_DIRECTIVE)
+
+_OUTPUT_FORMAT = """
 [OUTPUT - ONLY VALID JSON]
 {
   "message": "Your response. Be concise and punchy (under 150 words).",
@@ -79,4 +66,37 @@ GOAL (Round 4 — Final Offer with Counter-BATNA):
 }
 """
 
-    return base_persona + round_directive + output_format
+
+def build_defendant_prompt(case_data: dict, current_round: int) -> str:
+    get = case_data.get
+    case_title = get("case_title", "")
+    case_description = get("case_description", "")
+    evidence_summary = get("evidence_summary", "")
+    max_offer = get("defendant_max_offer", 0)
+    legal_context = get("legal_context", "")
+    defendant_description = get("defendant_description", "")
+    defendant_starting_offer = get("defendant_starting_offer")
+
+    defendant_context = ""
+    if defendant_description:
+        defendant_context += f"\nDefendant's Account: {defendant_description}"
+    if defendant_starting_offer:
+        defendant_context += f"\nDefendant's Initial Offer: RM {defendant_starting_offer}"
+
+    base_persona = _BASE_PERSONA.format(
+        case_title=case_title,
+        case_description=case_description if case_description else "Not provided.",
+        evidence_summary=evidence_summary,
+        defendant_context=defendant_context,
+        max_offer=max_offer,
+        legal_context=legal_context,
+        current_round=current_round,
+    )
+
+    # Any round outside 1-3 gets the final-round directive
+    directive_index = int(current_round) - 1 if current_round in (1, 2, 3) else 3
+    round_directive = _ROUND_DIRECTIVES[directive_index]
+    if directive_index >= 2:
+        round_directive = round_directive.format(max_offer=max_offer)
+
+    return "".join((base_persona, round_directive, _OUTPUT_FORMAT))
@@ -19,7 +19,6 @@ Dispute Amount: RM {dispute_amount}
 Case Description: {case_description}
 Defendant's Account: {defendant_description if defendant_description else "Not provided."}
 Evidence Summary: {evidence_summary}
-Legal Context: {legal_context}
 
 CITATION RULES:
 - Use legal citations strategically to support key arguments, NOT in every sentence.
@@ -34,6 +33,7 @@ STYLE RULES:
 - Conversational but professional tone.
 
 Secret Floor Price (Minimum Acceptable): RM {floor_price}
+Legal Context: {legal_context}
 Round: {current_round} of 4
 """
 
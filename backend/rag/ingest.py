@@ -1,5 +1,8 @@
 import os
+import hashlib
+import itertools
 import re
+import shelve
 import time
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
@@ -9,6 +12,13 @@ from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pinecone import Pinecone, ServerlessSpec
 
+# PyMuPDF extracts text far faster than pypdf; pypdf stays as the fallback
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 if os.getenv("GEMINI_API_KEY"):
@@ -18,6 +28,18 @@ INDEX_NAME = "lex-machina-index"
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 EMBEDDING_MODEL = "models/gemini-embedding-001"
 
+# Upload tuning: Pinecone recommends <=100 vectors per upsert request
+EMBED_BATCH_SIZE = 100
+UPSERT_BATCH_SIZE = 100
+UPSERT_POOL_THREADS = 30
+MAX_RETRIES = 5
+INDEX_READY_TIMEOUT_SEC = 120
+# Chunk embeddings from earlier runs, keyed by model + chunk text, so re-ingesting skips the embed API
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "backend/data/.embed_cache")
+# Vector ids keep the batch-of-5 numbering from the original sequential upload.
+# Ids are positional, so they only line up across runs with identical chunking.
+ID_BATCH_SIZE = 5
+
 # --- CONFIGURATION ---
 FILES_TO_INGEST = [
     #{ "path": "backend/data/Sale-of-Goods-Act-1957.pdf", "source": "Sale of Goods Act 1957", "category": "buying_goods", "type": "pdf" },
@@ -28,121 +50,118 @@ FILES_TO_INGEST = [
     { "path": "backend/data/Contracts-Act-1950.pdf", "source": "Contracts Act 1950", "category": "contracts", "type": "pdf" }
 ]
 
+# --- PATTERNS (compiled once; the SECTION branch matches every line) ---
+_PAGE_MARK_RE = re.compile(r'--- PAGE \d+ ---')
+_LAWS_OF_MALAYSIA_RE = re.compile(r'(?i)laws of malaysia')
+_ACT_NUMBER_RE = re.compile(r'(?i)act \d+')
+_PAGE_NUMBER_LINE_RE = re.compile(r'^\s*\d+\s*$', re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_NUMBERED_SECTION_RE = re.compile(r'\n\d+\.\s')
+_NUMBERED_SECTION_SPLIT_RE = re.compile(r'(?=\n\d+\.\s)')
+_LEADING_SECTION_NUM_RE = re.compile(r'^(\d+)\.')
+_SECTION_HEADER_RE = re.compile(r'(?im)^\s*SECTION\s+\d+[A-Za-z0-9()\-]*\s*:')
+# Whole "LAW: <name>" / "SECTION <num>: <title>" lines, found in one finditer pass.
+# [^\S\n] is \s minus the newline, so no match ever spans two lines.
+_HEADER_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:LAW:[^\S\n]*(?P<law>.+?)|SECTION[^\S\n]+(?P<num>[A-Za-z0-9()\-]+)[^\S\n]*:[^\S\n]*(?P<title>.*?))[^\S\n]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+_UNSAFE_ID_CHARS_RE = re.compile(r'[^a-zA-Z0-9]')
+
 def clean_pdf_noise(text):
     """Removes headers, footers, and page numbers that interrupt sentences."""
-    text = re.sub(r'--- PAGE \d+ ---', '', text)
-    text = re.sub(r'(?i)laws of malaysia', '', text)
-    text = re.sub(r'(?i)act \d+', '', text)
+    text = _PAGE_MARK_RE.sub('', text)
+    text = _LAWS_OF_MALAYSIA_RE.sub('', text)
+    text = _ACT_NUMBER_RE.sub('', text)
     # Remove floating page numbers on their own lines
-    text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+    text = _PAGE_NUMBER_LINE_RE.sub('', text)
     # Fix broken paragraphs caused by page breaks
-    text = re.sub(r'\n\s*\n', '\n\n', text).strip()
+    text = _BLANK_LINES_RE.sub('\n\n', text).strip()
     return text
 
+# 🛡️ THE CIRCUIT BREAKER: A safety splitter for dangerously large chunks (stateless, so shared)
+_SAFETY_SPLITTER = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=200)
+
+def _section_documents(section_text, section_num, source_name, category):
+    """Documents for one legal section, each tagged with a [Document | Section] header."""
+    header = f"[Document: {source_name} | Section: {section_num}"
+
+    # 🚨 THE FIX: Prevent giant chunks (like TOCs) from breaking the embeddings
+    if len(section_text) > 2000:
+        parts = [
+            (f"{header} (Part {sub_idx+1})]\n", sub_chunk)
+            for sub_idx, sub_chunk in enumerate(_SAFETY_SPLITTER.split_text(section_text))
+        ]
+    else:
+        parts = [(f"{header}]\n", section_text)]
+
+    return [
+        Document(
+            page_content=prefix + text,
+            metadata={"source": source_name, "category": category, "section": section_num}
+        )
+        for prefix, text in parts
+    ]
+
 def smart_legal_chunking(raw_text, source_name, category):
     """Splits text by Legal Section (e.g., '12. ') and extracts the section number."""
     documents = []
     
-    # 🛡️ THE CIRCUIT BREAKER: A safety splitter for dangerously large chunks
-    safety_splitter = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=200)
-    
     # Check if this document has standard numbered sections (like 1. , 2. , 15. )
-    if re.search(r'\n\d+\.\s', raw_text):
+    if _NUMBERED_SECTION_RE.search(raw_text):
         # Split using lookahead so we KEEP the "15. " at the start of the chunk
-        chunks = re.split(r'(?=\n\d+\.\s)', raw_text)
+        chunks = _NUMBERED_SECTION_SPLIT_RE.split(raw_text)
         
         for chunk in chunks:
             chunk = chunk.strip()
             if len(chunk) < 50: continue # Skip tiny fragments
             
             # Extract the section number for metadata
-            match = re.search(r'^(\d+)\.', chunk)
+            match = _LEADING_SECTION_NUM_RE.search(chunk)
             section_num = match.group(1) if match else "Intro_or_Misc"
             
-            # 🚨 THE FIX: Prevent giant chunks (like TOCs) from breaking the embeddings
-            if len(chunk) > 2000:
-                sub_chunks = safety_splitter.split_text(chunk)
-                for sub_idx, sub_chunk in enumerate(sub_chunks):
-                    injected_text = f"[Document: {source_name} | Section: {section_num} (Part {sub_idx+1})]\n{sub_chunk}"
-                    doc = Document(
-                        page_content=injected_text,
-                        metadata={"source": source_name, "category": category, "section": section_num}
-                    )
-                    documents.append(doc)
-            else:
-                injected_text = f"[Document: {source_name} | Section: {section_num}]\n{chunk}"
-                doc = Document(
-                    page_content=injected_text,
-                    metadata={"source": source_name, "category": category, "section": section_num}
-                )
-                documents.append(doc)
+            documents.extend(_section_documents(chunk, section_num, source_name, category))
             
-    elif re.search(r'(?im)^\s*SECTION\s+\d+[A-Za-z0-9()\-]*\s*:', raw_text):
+    elif _SECTION_HEADER_RE.search(raw_text):
         # Structured text style: LAW: ... then SECTION X: ...
         current_law = "Unknown Law"
         law_sections = []
         current_section_num = None
         current_section_title = ""
-        current_section_lines = []
+        body_start = 0
 
-        def flush_current_section():
+        def flush_current_section(body_end):
             if not current_section_num:
                 return
-            section_body = "\n".join(current_section_lines).strip()
+            section_body = text[body_start:body_end].strip()
             if len(section_body) < 30:
                 return
 
             full_section_text = f"LAW: {current_law}\nSECTION {current_section_num}: {current_section_title}\n{section_body}".strip()
             law_sections.append((current_section_num, full_section_text))
 
-        for line in raw_text.splitlines():
-            law_match = re.match(r'^\s*LAW:\s*(.+?)\s*$', line, flags=re.IGNORECASE)
-            if law_match:
-                flush_current_section()
+        # One "\n" per line break, so the multiline header regex sees exactly the lines splitlines() would
+        text = "\n".join(raw_text.splitlines())
+        for header_match in _HEADER_LINE_RE.finditer(text):
+            flush_current_section(header_match.start())
+            body_start = header_match.end()
+            law_name = header_match.group("law")
+            if law_name is not None:
                 current_section_num = None
                 current_section_title = ""
-                current_section_lines = []
-                current_law = law_match.group(1).strip()
-                continue
-
-            section_match = re.match(
-                r'^\s*SECTION\s+([A-Za-z0-9()\-]+)\s*:\s*(.*)$',
-                line,
-                flags=re.IGNORECASE,
-            )
-            if section_match:
-                flush_current_section()
-                current_section_num = section_match.group(1).strip()
-                current_section_title = section_match.group(2).strip()
-                current_section_lines = []
-                continue
-
-            if current_section_num:
-                current_section_lines.append(line)
-
-        flush_current_section()
+                current_law = law_name.strip()
+            else:
+                current_section_num = header_match.group("num").strip()
+                current_section_title = header_match.group("title").strip()
+
+        flush_current_section(len(text))
 
         for section_num, section_text in law_sections:
-            if len(section_text) > 2000:
-                sub_chunks = safety_splitter.split_text(section_text)
-                for sub_idx, sub_chunk in enumerate(sub_chunks):
-                    injected_text = f"[Document: {source_name} | Section: {section_num} (Part {sub_idx+1})]\n{sub_chunk}"
-                    doc = Document(
-                        page_content=injected_text,
-                        metadata={"source": source_name, "category": category, "section": section_num}
-                    )
-                    documents.append(doc)
-            else:
-                injected_text = f"[Document: {source_name} | Section: {section_num}]\n{section_text}"
-                doc = Document(
-                    page_content=injected_text,
-                    metadata={"source": source_name, "category": category, "section": section_num}
-                )
-                documents.append(doc)
+            documents.extend(_section_documents(section_text, section_num, source_name, category))
 
     else:
         # FALLBACK: For non-numbered text like tenancy_snippets.txt
-        docs = safety_splitter.create_documents(
+        docs = _SAFETY_SPLITTER.create_documents(
             [raw_text], 
             metadatas=[{"source": source_name, "category": category, "section": "Snippet"}]
         )
@@ -152,17 +171,135 @@ def smart_legal_chunking(raw_text, source_name, category):
             
     return documents
 
-def ingest_data():
-    print("🌲 Connecting to Pinecone...")
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-    
-    if INDEX_NAME not in [i.name for i in pc.list_indexes()]:
-        print(f"   -> Creating index: {INDEX_NAME}")
-        pc.create_index(name=INDEX_NAME, dimension=768, metric="dotproduct", spec=ServerlessSpec(cloud="aws", region="us-east-1"))
-        while not pc.describe_index(INDEX_NAME).status['ready']: time.sleep(1)
+def iter_pdf_pages(file_path):
+    """Yield the text of each PDF page in order."""
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(file_path) as pdf:
+            for page in pdf:
+                yield page.get_text("text")
+        return
+    for page in PyPDFLoader(file_path).lazy_load():
+        yield page.page_content
 
-    embeddings = GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+def load_clean_pdf_text(file_path):
+    """Clean each page as it is read, then collapse the blank runs left between pages."""
+    full_text = "\n".join(clean_pdf_noise(page_text) for page_text in iter_pdf_pages(file_path))
+    return _BLANK_LINES_RE.sub('\n\n', full_text).strip()
+
+def _chunks(iterable, size):
+    """Yield lists of up to `size` items from `iterable`."""
+    it = iter(iterable)
+    chunk = list(itertools.islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(it, size))
+
+def _with_backoff(label, fn, *args):
+    """Call fn(*args), cooling down and retrying on failure. Returns None if every attempt fails."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"      ❌ {label} failed attempt {attempt+1}/{MAX_RETRIES}: {e}")
+            if attempt + 1 < MAX_RETRIES:
+                wait_time = 30 * (attempt + 1)
+                print(f"      ...hitting limits, cooling down for {wait_time}s...")
+                time.sleep(wait_time)
+    print(f"❌ CRITICAL: {label} failed after {MAX_RETRIES} retries. Skipping.")
+    return None
+
+def _embed_texts(embeddings, texts):
+    vecs = embeddings.embed_documents(texts)
+
+    # 🚨 FAILSAFE: Un-flatten the Pydantic bug if it happens
+    if len(vecs) > 0 and not isinstance(vecs[0], list):
+        # The wrapper merged them into a single list of floats! Re-split them by 768.
+        flat_vec = vecs
+        vecs = [flat_vec[k*768 : (k+1)*768] for k in range(len(texts))]
+    elif len(vecs) == 1 and len(vecs[0]) > 768 and len(texts) > 1:
+        # Variant of the flattening bug
+        flat_vec = vecs[0]
+        vecs = [flat_vec[k*768 : (k+1)*768] for k in range(len(texts))]
+
+    # A short batch would silently drop chunks in zip(); fail so the batch is retried
+    if len(vecs) != len(texts):
+        raise ValueError(f"expected {len(texts)} embeddings, got {len(vecs)}")
+    return vecs
+
+def _embed_cache_key(text):
+    return hashlib.blake2b(f"{EMBEDDING_MODEL}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+def _build_records(embeddings, chunked_docs, embed_cache):
+    """Embed every chunk (reusing vectors from earlier runs) and return Pinecone upsert records."""
+    keys = [_embed_cache_key(doc.page_content) for doc in chunked_docs]
+    vectors = [embed_cache.get(key) for key in keys]
+    misses = [n for n, vec in enumerate(vectors) if vec is None]
+    print(f"   -> {len(chunked_docs) - len(misses)} chunks cached, {len(misses)} to embed.")
 
+    for start in range(0, len(misses), EMBED_BATCH_SIZE):
+        batch = misses[start : start + EMBED_BATCH_SIZE]
+        texts = [chunked_docs[n].page_content for n in batch]
+        print(f"   -> Embedding {start + 1}-{start + len(batch)} of {len(misses)}...")
+
+        vecs = _with_backoff("Embedding batch", _embed_texts, embeddings, texts)
+        if vecs is None:
+            continue
+
+        for n, vec in zip(batch, vecs):
+            vectors[n] = vec
+            embed_cache[keys[n]] = vec
+
+    # A file has one source and few distinct sections; sanitise each value once
+    safe_ids = {}
+    def safe_id(value):
+        safe = safe_ids.get(value)
+        if safe is None:
+            safe = safe_ids[value] = _UNSAFE_ID_CHARS_RE.sub('_', value)
+        return safe
+
+    records = []
+    for n, (doc, vec) in enumerate(zip(chunked_docs, vectors)):
+        if vec is None:
+            continue
+        meta = doc.metadata
+        safe_source = safe_id(meta.get("source", "doc"))
+        safe_sec = safe_id(str(meta.get("section", "0")))
+        # Positional id (chunk index within the file). The PyMuPDF loader and per-page
+        # cleaning changed chunk boundaries, so vectors from older ingests do not share
+        # these ids — clear the index (full re-index) before re-ingesting after such changes.
+        doc_id = f"{safe_source}_Sec_{safe_sec}_b{n - n % ID_BATCH_SIZE}_i{n % ID_BATCH_SIZE}"
+
+        # Absolute guarantee that Pinecone won't crash
+        clean_vec = vec[:768] if len(vec) > 768 else vec
+        if len(clean_vec) < 768:
+            clean_vec.extend([0.0] * (768 - len(clean_vec)))
+
+        records.append({"id": doc_id, "values": clean_vec, "metadata": meta | {"text": doc.page_content}})
+    return records
+
+def _upsert_parallel(index, records):
+    """Native Pinecone upload (bypasses Langchain): every batch in flight at once, failed batches retried."""
+    batches = list(_chunks(records, UPSERT_BATCH_SIZE))
+    pending = [(batch, index.upsert(vectors=batch, async_req=True)) for batch in batches]
+    for batch_no, (batch, async_result) in enumerate(pending, start=1):
+        try:
+            async_result.get()
+        except Exception as e:
+            print(f"      ❌ Upsert batch {batch_no}/{len(batches)} failed: {e}")
+            _with_backoff(f"Upsert batch {batch_no}", index.upsert, batch)
+    print(f"      ...uploaded {len(batches)} batches")
+
+def _wait_for_index_ready(pc):
+    """Poll a freshly created index until it is ready, giving up after INDEX_READY_TIMEOUT_SEC."""
+    deadline = time.monotonic() + INDEX_READY_TIMEOUT_SEC
+    delay = 1
+    while not pc.describe_index(INDEX_NAME).status['ready']:
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Index {INDEX_NAME} not ready after {INDEX_READY_TIMEOUT_SEC}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+
+def _ingest_files(index, embeddings, embed_cache):
     for file_config in FILES_TO_INGEST:
         file_path = file_config["path"]
         if not os.path.exists(file_path):
@@ -173,9 +310,7 @@ def ingest_data():
         
         # Load File
         if file_config["type"] == "pdf":
-            raw_pages = PyPDFLoader(file_path).load()
-            full_text = "\n".join([page.page_content for page in raw_pages])
-            full_text = clean_pdf_noise(full_text) # Clean the PDF noise!
+            full_text = load_clean_pdf_text(file_path) # Clean the PDF noise, page by page!
         else:
             full_text = TextLoader(file_path, encoding='utf-8').load()[0].page_content
 
@@ -183,68 +318,33 @@ def ingest_data():
         chunked_docs = smart_legal_chunking(full_text, file_config["source"], file_config["category"])
         print(f"   -> Created {len(chunked_docs)} chunks.")
 
-        print("🚀 Uploading vectors (Super Safe Mode)...")
-        BATCH_SIZE = 5 
-        SLEEP_TIME = 5
-        total_docs = len(chunked_docs)
-        
-        # Connect directly to the Pinecone index, bypassing the Langchain wrapper
-        index = pc.Index(INDEX_NAME)
-        
-        for i in range(0, total_docs, BATCH_SIZE):
-            batch_docs = chunked_docs[i : i + BATCH_SIZE]
-            
-            print(f"   -> Processing batch {i // BATCH_SIZE + 1}/{(total_docs // BATCH_SIZE) + 1}...")
-            
-            max_retries = 5
-            for attempt in range(max_retries):
-                try:
-                    # 1. Manually get texts and metadata
-                    texts = [doc.page_content for doc in batch_docs]
-                    metas = [doc.metadata for doc in batch_docs]
-                    
-                    # 2. Embed via Google
-                    vecs = embeddings.embed_documents(texts)
-                    
-                    # 3. 🚨 FAILSAFE: Un-flatten the Pydantic bug if it happens
-                    if len(vecs) > 0 and not isinstance(vecs[0], list):
-                        # The wrapper merged them into a single list of floats! Re-split them by 768.
-                        flat_vec = vecs
-                        vecs = [flat_vec[k*768 : (k+1)*768] for k in range(len(texts))]
-                    elif len(vecs) == 1 and len(vecs[0]) > 768 and len(texts) > 1:
-                        # Variant of the flattening bug
-                        flat_vec = vecs[0]
-                        vecs = [flat_vec[k*768 : (k+1)*768] for k in range(len(texts))]
-
-                    # 4. Prepare records for Pinecone
-                    records = []
-                    for idx, (vec, meta) in enumerate(zip(vecs, metas)):
-                        safe_source = re.sub(r'[^a-zA-Z0-9]', '_', meta.get("source", "doc"))
-                        safe_sec = re.sub(r'[^a-zA-Z0-9]', '_', str(meta.get("section", "0")))
-                        doc_id = f"{safe_source}_Sec_{safe_sec}_b{i}_i{idx}"
-                        doc_text = texts[idx]
-                        
-                        # Absolute guarantee that Pinecone won't crash
-                        clean_vec = vec[:768] if len(vec) > 768 else vec
-                        if len(clean_vec) < 768:
-                            clean_vec.extend([0.0] * (768 - len(clean_vec)))
-                            
-                        record_metadata = {**meta, "text": doc_text}
-                        records.append({"id": doc_id, "values": clean_vec, "metadata": record_metadata})
-                        
-                    # 5. Native Pinecone Upload (Bypasses Langchain completely)
-                    index.upsert(vectors=records)
-                    
-                    print(f"      ...success (sleeping {SLEEP_TIME}s)...")
-                    time.sleep(SLEEP_TIME) 
-                    break 
-                except Exception as e:
-                    print(f"      ❌ Failed attempt {attempt+1}/{max_retries}: {e}")
-                    wait_time = 30 * (attempt + 1)
-                    print(f"      ...hitting limits, cooling down for {wait_time}s...")
-                    time.sleep(wait_time)
-            else:
-                print("❌ CRITICAL: Batch failed after 5 retries. Skipping.")
+        print("🚀 Embedding chunks...")
+        records = _build_records(embeddings, chunked_docs, embed_cache)
+        if not records:
+            print("❌ CRITICAL: No chunks could be embedded. Skipping upload.")
+            continue
+
+        print(f"🚀 Uploading {len(records)} vectors in parallel...")
+        _upsert_parallel(index, records)
+        embed_cache.sync()
+
+def ingest_data():
+    print("🌲 Connecting to Pinecone...")
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    
+    existing_indexes = {i.name for i in pc.list_indexes()}
+    if INDEX_NAME not in existing_indexes:
+        print(f"   -> Creating index: {INDEX_NAME}")
+        pc.create_index(name=INDEX_NAME, dimension=768, metric="dotproduct", spec=ServerlessSpec(cloud="aws", region="us-east-1"))
+        _wait_for_index_ready(pc)
+
+    embeddings = GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+    # Connect directly to the Pinecone index, bypassing the Langchain wrapper.
+    # pool_threads backs the async_req upserts in _upsert_parallel.
+    index = pc.Index(INDEX_NAME, pool_threads=UPSERT_POOL_THREADS)
+
+    with shelve.open(EMBED_CACHE_PATH) as embed_cache:
+        _ingest_files(index, embeddings, embed_cache)
 
     print("\n✅ All Laws Ingested Successfully!")
 
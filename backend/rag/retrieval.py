@@ -1,15 +1,25 @@
+import concurrent.futures
+import hashlib
+import math
+import operator
 import os
+import threading
 import time
 import json
 import requests
+import requests.adapters
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from pinecone import Pinecone
+from backend.core.logging_setup import get_logger
+from backend.core.ttl_cache import TTLCache
 
 # Load env variables
 load_dotenv()
 
+log = get_logger("rag")
+
 INDEX_NAME = "lex-machina-index"
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -23,29 +33,119 @@ EMBEDDING_MODEL = "models/gemini-embedding-001"
 GENERATION_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "gemini-2.5-flash-lite")
 
+# One turn fans out 3-5 sub-queries (embed + Pinecone query each)
+RAG_SEARCH_WORKERS = 8
+_RAG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=RAG_SEARCH_WORKERS, thread_name_prefix="rag")
+
 # Module-level singletons — initialized once on first use
 _retrieval_index = None
 _retrieval_embeddings = None
 
+_retrieval_clients_lock = threading.Lock()
+
 def _get_retrieval_clients():
     global _retrieval_index, _retrieval_embeddings
-    if _retrieval_index is None:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        _retrieval_index = pc.Index(INDEX_NAME)
-    if _retrieval_embeddings is None:
-        _retrieval_embeddings = GoogleGenerativeAIEmbeddings(
-            model=EMBEDDING_MODEL,
-            google_api_key=GEMINI_API_KEY,
-        )
+    if _retrieval_index is None or _retrieval_embeddings is None:
+        # Turns run on worker threads; build the clients once even when the first calls race
+        with _retrieval_clients_lock:
+            if _retrieval_index is None:
+                pc = Pinecone(api_key=PINECONE_API_KEY)
+                _retrieval_index = pc.Index(INDEX_NAME, pool_threads=RAG_SEARCH_WORKERS)
+            if _retrieval_embeddings is None:
+                _retrieval_embeddings = GoogleGenerativeAIEmbeddings(
+                    model=EMBEDDING_MODEL,
+                    google_api_key=GEMINI_API_KEY,
+                )
     return _retrieval_index, _retrieval_embeddings
 
+
+# Query embeddings are deterministic per model, so repeat queries skip the embedding call
+_EMBED_CACHE = TTLCache(maxsize=4096, ttl=86400)
+
+
+# Pinecone matches per sub-query. A query whose embedding is within
+# RAG_SEMANTIC_THRESHOLD cosine of a cached one (a paraphrase) reuses its matches.
+RAG_MATCH_CACHE_TTL_SEC = int(os.getenv("RAG_MATCH_CACHE_TTL_SEC", "3600"))
+RAG_SEMANTIC_THRESHOLD = float(os.getenv("RAG_SEMANTIC_THRESHOLD", "0.95"))
+_MATCH_CACHE = TTLCache(maxsize=256, ttl=RAG_MATCH_CACHE_TTL_SEC)
+
+
+def _query_key(text: str) -> str:
+    return hashlib.blake2b(f"{EMBEDDING_MODEL}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _embed_query(embeddings, text: str) -> List[float]:
+    key = _query_key(text)
+    vector = _EMBED_CACHE.get(key)
+    if vector is None:
+        vector = embeddings.embed_query(text)
+        _EMBED_CACHE.set(key, vector)
+    return vector
+
+
+def _unit_vector(vector: List[float]) -> tuple:
+    norm = math.sqrt(sum(map(operator.mul, vector, vector))) or 1.0
+    return tuple(x / norm for x in vector)
+
+
+def _query_matches(index, text: str, query_vector: List[float], category_filter: Optional[str]) -> list:
+    """Pinecone top-3 matches for one sub-query, served from _MATCH_CACHE when possible."""
+    key = (_query_key(text), category_filter)
+    cached = _MATCH_CACHE.get(key)
+    if cached is not None:
+        return cached[2]
+
+    unit = _unit_vector(query_vector)
+    for _key, (cached_unit, cached_filter, matches) in _MATCH_CACHE.items():
+        if cached_filter == category_filter and sum(map(operator.mul, unit, cached_unit)) >= RAG_SEMANTIC_THRESHOLD:
+            log.info("💾 RAG semantic cache hit")
+            return matches
+
+    filter_dict = {}
+    if category_filter:
+        filter_dict["category"] = category_filter
+
+    results = index.query(
+        vector=query_vector,
+        top_k=3,
+        include_metadata=True,
+        filter=filter_dict
+    )
+    matches = results.get("matches", [])
+    _MATCH_CACHE.set(key, (unit, category_filter, matches))
+    return matches
+
+# Shared session so query-generation calls reuse pooled keep-alive connections
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16))
+                _http_session = session
+    return _http_session
+
+
+MIN_QUERY_CHARS = 8
+# Query generation only needs the recent thread, not the whole transcript
+RAG_HISTORY_MAX_MESSAGES = 8
+RAG_HISTORY_MAX_CHARS = 500
+
+# Generated sub-queries per query-generation prompt (which embeds the user input and history)
+_QUERY_GEN_CACHE = TTLCache(maxsize=1024, ttl=86400)
+
 def call_gemini_with_backoff(prompt: str) -> str:
     """
     Call Gemini for agentic query generation with 20s timeout.
     Retries with fallback model on failure before giving up.
     """
     if not GEMINI_API_KEY:
-        print("❌ Missing GEMINI_API_KEY/GOOGLE_API_KEY for query generation.")
+        log.error("❌ Missing GEMINI_API_KEY/GOOGLE_API_KEY for query generation.")
         return ""
 
     def _try_model(model_name: str, max_attempts: int = 2) -> str:
@@ -53,19 +153,19 @@ def call_gemini_with_backoff(prompt: str) -> str:
         payload = {"contents": [{"parts": [{"text": prompt}]}]}
         for i in range(max_attempts):
             try:
-                response = requests.post(url, json=payload, timeout=20)
+                response = _get_http_session().post(url, json=payload, timeout=20)
                 if response.status_code == 200:
                     return response.json().get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', "")
                 elif response.status_code == 429:
                     wait_time = min(2 ** i, 4)
-                    print(f"⚠️ Quota hit on {model_name}. Retrying in {wait_time}s...")
+                    log.warning("⚠️ Quota hit on %s. Retrying in %ss...", model_name, wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
-                    print(f"❌ API Error on {model_name}: {response.status_code}")
+                    log.error("❌ API Error on %s: %s", model_name, response.status_code)
                     return ""
             except Exception as e:
-                print(f"❌ Error on {model_name}: {e}")
+                log.error("❌ Error on %s: %s", model_name, e)
                 if i < max_attempts - 1:
                     time.sleep(min(2 ** i, 4))
         return ""
@@ -73,18 +173,17 @@ def call_gemini_with_backoff(prompt: str) -> str:
     result = _try_model(GENERATION_MODEL, max_attempts=1)
     if result:
         return result
-    print(f"⚠️ Primary model failed for RAG query generation. Trying fallback: {FALLBACK_MODEL}")
+    log.warning("⚠️ Primary model failed for RAG query generation. Trying fallback: %s", FALLBACK_MODEL)
     return _try_model(FALLBACK_MODEL, max_attempts=1)
 
 def format_history_for_prompt(history: List[Dict[str, Any]]) -> str:
+    """Recent turns only: the last RAG_HISTORY_MAX_MESSAGES, each cut to RAG_HISTORY_MAX_CHARS."""
     if not history:
         return "No prior history."
-    formatted = ""
-    for msg in history:
-        role = msg.get("role", "unknown").upper()
-        content = msg.get("content", "")
-        formatted += f"{role}: {content}\n"
-    return formatted
+    return "".join(
+        f"{msg.get('role', 'unknown').upper()}: {(msg.get('content') or '')[:RAG_HISTORY_MAX_CHARS]}\n"
+        for msg in history[-RAG_HISTORY_MAX_MESSAGES:]
+    )
 
 def generate_legal_queries(user_input: str, history: List[Dict[str, Any]]) -> List[str]:
     """
@@ -113,17 +212,45 @@ def generate_legal_queries(user_input: str, history: List[Dict[str, Any]]) -> Li
     Return ONLY the search queries, one per line. Do not number them.
     """
     
-    print(f"🧠 Agentic Brain is reasoning...")
+    key = hashlib.blake2b(f"{GENERATION_MODEL}|{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+    cached = _QUERY_GEN_CACHE.get(key)
+    if cached is not None:
+        log.info("💾 Reusing %s generated search queries", len(cached))
+        return list(cached)
+
+    log.info("🧠 Agentic Brain is reasoning...")
     raw_text = call_gemini_with_backoff(prompt)
     
-    queries = [q.strip() for q in raw_text.split('\n') if q.strip()]
+    queries = []
+    seen = set()
+    for line in raw_text.split('\n'):
+        q = line.strip()
+        # Drop leaked list markers / fragments and case-only repeats: each costs an embed + a Pinecone query
+        if len(q) < MIN_QUERY_CHARS or q.casefold() in seen:
+            continue
+        seen.add(q.casefold())
+        queries.append(q)
     
-    print(f"🤖 Generated {len(queries)} Search Queries:")
-    for q in queries:
-        print(f"   -> {q}")
+    log.info("🤖 Generated %s Search Queries: %s", len(queries), queries)
+    # Empty means the call failed; let the next turn retry instead of caching it
+    if queries:
+        _QUERY_GEN_CACHE.set(key, tuple(queries))
         
     return queries
 
+def _search_one(index, embeddings, q: str, category_filter: Optional[str]) -> list:
+    try:
+        query_vector = _embed_query(embeddings, q)
+        
+        # M2 Safety Slice
+        if len(query_vector) > 768:
+            query_vector = query_vector[:768]
+
+        return _query_matches(index, q, query_vector, category_filter)
+    except Exception as search_err:
+        log.warning("⚠️ Single search failed: %s", search_err)
+        return []
+
 def retrieve_law(
     query: str,
     history: Optional[List[Dict[str, Any]]] = None,
@@ -143,7 +270,7 @@ def retrieve_law(
             if generated_queries:
                 search_queries = generated_queries
             else:
-                print("⚠️ Agentic query generation returned empty. Falling back to direct query.")
+                log.warning("⚠️ Agentic query generation returned empty. Falling back to direct query.")
                 search_queries = [query]
 
         all_matches = []
@@ -153,36 +280,16 @@ def retrieve_law(
         index, embeddings = _get_retrieval_clients()
 
         # 3. Execute Searches
-        print(f"🔎 Executing searches against Pinecone...")
+        log.info("🔎 Executing searches against Pinecone...")
         
-        for q in search_queries:
-            try:
-                query_vector = embeddings.embed_query(q)
-                
-                # M2 Safety Slice
-                if len(query_vector) > 768:
-                    query_vector = query_vector[:768]
-
-                filter_dict = {}
-                if category_filter:
-                    filter_dict["category"] = category_filter
-
-                results = index.query(
-                    vector=query_vector,
-                    top_k=3, 
-                    include_metadata=True,
-                    filter=filter_dict
-                )
-                
-                for match in results.get("matches", []):
-                    match_id = match.get("id")
-                    if match_id in seen_ids:
-                        continue
-                    seen_ids.add(match_id)
-                    all_matches.append(match)
-            except Exception as search_err:
-                print(f"⚠️ Single search failed: {search_err}")
-                continue
+        # Sub-queries are independent network round trips; run them side by side
+        for matches in _RAG_POOL.map(lambda q: _search_one(index, embeddings, q, category_filter), search_queries):
+            for match in matches:
+                match_id = match.get("id")
+                if match_id in seen_ids:
+                    continue
+                seen_ids.add(match_id)
+                all_matches.append(match)
 
         # 4. Sort and Limit
         all_matches.sort(key=lambda x: x.get("score", 0.0), reverse=True)
@@ -209,7 +316,7 @@ def retrieve_law(
         return structured_results
 
     except Exception as e:
-        print(f"❌ RAG Critical Error: {e}")
+        log.error("❌ RAG Critical Error: %s", e)
         return []
 
 # ==========================================
@@ -1,7 +1,11 @@
 import json
 import os
+import threading
 from google.cloud import texttospeech
 from google.oauth2 import service_account
+from backend.core.logging_setup import get_logger
+
+log = get_logger("tts")
 
 VOICE_BY_ROLE = {
     "plaintiff": ("en-US-Neural2-D", texttospeech.SsmlVoiceGender.MALE),
@@ -10,7 +14,21 @@ VOICE_BY_ROLE = {
 }
 
 
+# One client per process: it owns a gRPC channel that concurrent synthesis calls multiplex over
+_tts_client = None
+_tts_client_lock = threading.Lock()
+
+
 def _get_tts_client() -> texttospeech.TextToSpeechClient:
+    global _tts_client
+    if _tts_client is None:
+        with _tts_client_lock:
+            if _tts_client is None:
+                _tts_client = _build_tts_client()
+    return _tts_client
+
+
+def _build_tts_client() -> texttospeech.TextToSpeechClient:
     creds_json = os.environ.get("GOOGLE_CREDENTIALS_JSON")
     if creds_json:
         creds_info = json.loads(creds_json)
@@ -22,16 +40,24 @@ def _get_tts_client() -> texttospeech.TextToSpeechClient:
     return texttospeech.TextToSpeechClient()  # Falls back to ADC
 
 
+def _voice_params(role: str) -> tuple:
+    """(voice name, gender) for a role; unknown roles get the mediator voice."""
+    # Callers almost always pass the canonical lowercase role, so skip normalising then
+    params = VOICE_BY_ROLE.get(role)
+    if params is None:
+        params = VOICE_BY_ROLE.get((role or "").lower().strip(), VOICE_BY_ROLE["mediator"])
+    return params
+
+
 def get_voice_for_role(role: str) -> str:
-    return VOICE_BY_ROLE.get((role or "").lower().strip(), VOICE_BY_ROLE["mediator"])[0]
+    return _voice_params(role)[0]
 
 
 def synthesize_audio_bytes(text: str, role: str) -> bytes:
     safe_text = (text or "").strip()
     if not safe_text:
         return b""
-    role_key = (role or "").lower().strip()
-    voice_name, gender = VOICE_BY_ROLE.get(role_key, VOICE_BY_ROLE["mediator"])
+    voice_name, gender = _voice_params(role)
     try:
         client = _get_tts_client()
         response = client.synthesize_speech(
@@ -47,5 +73,5 @@ def synthesize_audio_bytes(text: str, role: str) -> bytes:
         )
         return response.audio_content
     except Exception as e:
-        print(f"[TTS] ERROR role={role!r} voice={voice_name!r}: {type(e).__name__}: {e}")
+        log.error("[TTS] ERROR role=%r voice=%r: %s: %s", role, voice_name, type(e).__name__, e)
         raise
@@ -8,6 +8,9 @@ import sys
 # ==========================================
 BASE_URL = "http://localhost:8005/api" 
 
+# One session so every step reuses the same keep-alive connection
+SESSION = requests.Session()
+
 def run_test():
     print(f"🚀 STARTING INTEGRATION TEST against {BASE_URL}")
     print("========================================")
@@ -15,7 +18,7 @@ def run_test():
     # 1. START CASE (Mimics clicking "Start Case" on UI)
     print("\n🔹 [STEP 1] Starting Case...")
     try:
-        res = requests.post(f"{BASE_URL}/cases/start", json={
+        res = SESSION.post(f"{BASE_URL}/cases/start", json={
             "title": "Test Dispute", 
             "caseType": "tenancy_deposit"
         })
@@ -32,7 +35,7 @@ def run_test():
 
     # 2. TRIGGER AI (Mimics the backend starting the loop)
     print("\n🔹 [STEP 2] Triggering AI Agent...")
-    requests.post(f"{BASE_URL}/cases/{case_id}/run", json={"mode": "mvp"})
+    SESSION.post(f"{BASE_URL}/cases/{case_id}/run", json={"mode": "mvp"})
     print("✅ Signal sent to Agent.")
 
 if __name__ == "__main__":
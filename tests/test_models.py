@@ -20,7 +20,7 @@ def test_turn_request():
         evidence_uris=["https://generativelanguage.googleapis.com/v1beta/files/abc"],
         floor_price=1500
     )
-    print("✅ TurnRequest:", request.dict())
+    print("✅ TurnRequest:", request.model_dump())
 
 
 def test_turn_response():
@@ -40,7 +40,7 @@ def test_turn_response():
         game_state="active",
         counter_offer_rm=1200
     )
-    print("✅ TurnResponse:", response.dict())
+    print("✅ TurnResponse:", response.model_dump())
 
 
 def test_settlement():
@@ -60,7 +60,7 @@ def test_settlement():
         plaintiff_final_offer=1500,
         defendant_final_offer=1000
     )
-    print("✅ Settlement:", settlement.dict())
+    print("✅ Settlement:", settlement.model_dump())
 
 
 if __name__ == "__main__":
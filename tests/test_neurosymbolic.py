@@ -0,0 +1,42 @@
+"""
+Test offer parsing and game-state evaluation in the neurosymbolic layer
+"""
+from backend.logic.neurosymbolic import _to_int_offer, evaluate_game_state
+
+
+def test_offer_parsing():
+    """Numbers and numeric strings parse; junk, negatives and bools don't."""
+    assert _to_int_offer(1500) == 1500
+    assert _to_int_offer(1500.9) == 1500
+    assert _to_int_offer("2,000") == 2000
+    assert _to_int_offer(" 1500\n") == 1500
+    assert _to_int_offer("1 500") is None
+    assert _to_int_offer("1_000") is None
+    assert _to_int_offer("+5") is None
+    assert _to_int_offer("\u0665") is None  # Arabic-Indic digit
+    assert _to_int_offer("-5") is None
+    assert _to_int_offer(-5) is None
+    assert _to_int_offer("RM 1500") is None
+    assert _to_int_offer("1500.50") is None
+    assert _to_int_offer("") is None
+    assert _to_int_offer("9" * 100_000) is None
+    assert _to_int_offer(True) is None
+    assert _to_int_offer(None) is None
+    print("✅ Offer parsing")
+
+
+def test_game_state():
+    """Floor check and final-round flag."""
+    result = evaluate_game_state({"counter_offer_rm": "2,000"}, floor_price=1000)
+    assert result == {"has_offer": True, "offer_amount": 2000, "meets_floor": True, "final_round": False}
+    result = evaluate_game_state({"counter_offer_rm": None}, floor_price=1000, current_round=4)
+    assert result == {"has_offer": False, "offer_amount": None, "meets_floor": False, "final_round": True}
+    # No-offer results are shared, not rebuilt per call
+    assert evaluate_game_state({}, floor_price=0) is evaluate_game_state({"counter_offer_rm": "n/a"}, floor_price=0)
+    print("✅ Game state")
+
+
+if __name__ == "__main__":
+    test_offer_parsing()
+    test_game_state()
+    print("\n🎉 Neurosymbolic layer validated!")
@@ -5,41 +5,46 @@ Run this to test without running the full FastAPI server
 """
 import os
 import sys
-from dotenv import load_dotenv
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
 
 # Add parent directory to path so imports work
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-load_dotenv()
-print(f"API key: {os.getenv('GEMINI_API_KEY')[:10]}...")
-# Initialize Firebase manually
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-if not firebase_admin._apps:
-    cred_path = os.getenv("FIREBASE_SERVICE_ACCOUNT")
-    # Option 2: If not in .env, try relative to current file
-    if not cred_path or not os.path.isfile(cred_path):
-        # Get the directory where this script is located
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        cred_path = os.path.join(script_dir, "serviceAccountKey.json")
+sys.path.insert(0, str(HERE.parent))
+
+
+def init_firebase():
+    """Load .env and initialise the Firebase Admin app (heavy SDK imports happen here, not at import)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    print(f"API key: {os.getenv('GEMINI_API_KEY')[:10]}...")
+    # Initialize Firebase manually
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if not firebase_admin._apps:
+        env_cred = os.getenv("FIREBASE_SERVICE_ACCOUNT")
+        cred_path = Path(env_cred) if env_cred else None
+        cred_exists = cred_path is not None and cred_path.is_file()
+        # Option 2: If not in .env, try next to this file
+        if not cred_exists:
+            cred_path = HERE / "serviceAccountKey.json"
+            cred_exists = cred_path.is_file()
     
-    # Debug output
-    print(f"🔍 Looking for credentials at: {cred_path}")
-    print(f"🔍 File exists: {os.path.isfile(cred_path)}")
+        # Debug output
+        print(f"🔍 Looking for credentials at: {cred_path}")
+        print(f"🔍 File exists: {cred_exists}")
     
-    if cred_path and os.path.isfile(cred_path):
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-        print("✅ Firebase initialized")
-    else:
-        print("❌ Firebase credentials not found")
-        print(f"❌ Tried path: {cred_path}")
-        print(f"❌ Current working directory: {os.getcwd()}")
-        sys.exit(1)
-
-# Import and test orchestrator
-from backend.core.orchestrator import run_negotiation_turn
+        if cred_exists:
+            cred = credentials.Certificate(str(cred_path))
+            firebase_admin.initialize_app(cred)
+            print("✅ Firebase initialized")
+        else:
+            print("❌ Firebase credentials not found")
+            print(f"❌ Tried path: {cred_path}")
+            print(f"❌ Current working directory: {os.getcwd()}")
+            sys.exit(1)
+
 
 #below is phase 1 testing:
 # def test_orchestrator():
@@ -94,45 +99,55 @@ from backend.core.orchestrator import run_negotiation_turn
 #     test_orchestrator()
 
 #here is phase 2 testing
+def main():
+    init_firebase()
+    from firebase_admin import firestore
+    from backend.core.orchestrator import run_negotiation_turn
+
+    db = firestore.client()
+    test_case_id = "phase2-test-001"
+
+    # Case doc + test evidence in one commit (one round trip)
+    case_ref = db.collection("cases").document(test_case_id)
+    batch = db.batch()
+    batch.set(case_ref, {
+        "status": "created",
+        "title": "Tenancy Deposit Dispute - Phase 2 Test",
+        "caseType": "tenancy_deposit",
+        "createdAt": firestore.SERVER_TIMESTAMP,
+    })
+    batch.set(case_ref.collection("evidence").document(), {
+        "fileType": "text",
+        "extractedText": "Deposit: RM2500. Move-in: Jan 2024. Tenant claims unfair deductions.",
+        "createdAt": firestore.SERVER_TIMESTAMP,
+    })
+    batch.commit()
+
+    print(f"✅ Test case created: {test_case_id}")
+    print("model: ", os.getenv("GEMINI_MODEL"))
+
+    # Run Turn 1
+    print("\n" + "="*60)
+    print("Testing Turn 1")
+    print("="*60)
+
+    result = run_negotiation_turn(
+        case_id=test_case_id,
+        user_message="I demand my full deposit back. The property was in perfect condition.",
+        current_round=1,
+        user_role="plaintiff",
+        floor_price=2000,
+    )
+
+    print(f"\n✅ Turn 1 Complete:")
+    print(f"Game State: {result['game_state']}")
+    print(f"Auditor Passed: {result['auditor_passed']}")
+    print(f"Counter Offer: RM{result['counter_offer_rm']}")
+    print(f"Agent Message: {result['agent_message'][:200]}...")
+
+    if result['auditor_warning']:
+        print(f"⚠️  Auditor Warning: {result['auditor_warning']}")
+
 
-db = firestore.client()
-test_case_id = "phase2-test-001"
-
-db.collection("cases").document(test_case_id).set({
-    "status": "created",
-    "title": "Tenancy Deposit Dispute - Phase 2 Test",
-    "caseType": "tenancy_deposit",
-    "createdAt": firestore.SERVER_TIMESTAMP,
-})
-
-# Add test evidence
-db.collection("cases").document(test_case_id).collection("evidence").add({
-    "fileType": "text",
-    "extractedText": "Deposit: RM2500. Move-in: Jan 2024. Tenant claims unfair deductions.",
-    "createdAt": firestore.SERVER_TIMESTAMP,
-})
-
-print(f"✅ Test case created: {test_case_id}")
-print("model: ", os.getenv("GEMINI_MODEL"))
-
-# Run Turn 1
-print("\n" + "="*60)
-print("Testing Turn 1")
-print("="*60)
-
-result = run_negotiation_turn(
-    case_id=test_case_id,
-    user_message="I demand my full deposit back. The property was in perfect condition.",
-    current_round=1,
-    user_role="plaintiff",
-    floor_price=2000,
-)
-
-print(f"\n✅ Turn 1 Complete:")
-print(f"Game State: {result['game_state']}")
-print(f"Auditor Passed: {result['auditor_passed']}")
-print(f"Counter Offer: RM{result['counter_offer_rm']}")
-print(f"Agent Message: {result['agent_message'][:200]}...")
-
-if result['auditor_warning']:
-    print(f"⚠️  Auditor Warning: {result['auditor_warning']}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Test the in-process TTL cache used for RAG / TTS / LLM memoization
+"""
+import time
+
+from backend.core.ttl_cache import TTLCache
+
+
+def test_get_set_and_expiry():
+    """Entries are returned until their TTL elapses."""
+    cache = TTLCache(maxsize=4, ttl=0.05)
+    cache.set("a", [1, 2])
+    assert cache.get("a") == [1, 2]
+    assert "a" in cache
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert "a" not in cache
+    print("✅ TTL expiry")
+
+
+def test_lru_eviction():
+    """Least-recently-used entry is evicted past maxsize."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # touch "a" so "b" is the LRU entry
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    print("✅ LRU eviction")
+
+
+def test_per_entry_ttl_and_pop():
+    """A per-call ttl overrides the default; pop removes the entry."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("short", "x", ttl=0.01)
+    cache.set("long", "y")
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.pop("long") == "y"
+    assert cache.get("long") is None
+    print("✅ Per-entry TTL + pop")
+
+
+def test_items_snapshot():
+    """items() lists live entries only, without refreshing them."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    cache.set("gone", 2, ttl=0.01)
+    cache.set("b", 3)
+    time.sleep(0.02)
+    assert cache.items() == [("a", 1), ("b", 3)]
+    cache.set("c", 4)
+    cache.set("d", 5)
+    cache.set("e", 6)  # evicts "a": items() did not move it to the end
+    assert cache.get("a") is None
+    print("✅ Items snapshot")
+
+
+if __name__ == "__main__":
+    test_get_set_and_expiry()
+    test_lru_eviction()
+    test_per_entry_ttl_and_pop()
+    test_items_snapshot()
+    print("\n🎉 TTL cache validated!")